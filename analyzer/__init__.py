@@ -0,0 +1,5 @@
+"""Headless parsing and aggregation engine for Medivia's Loot.txt"""
+
+from analyzer.engine import LogParser, LootEngine, KillEvent, LootEvent
+from analyzer.names import ItemNormalizer, normalize_plural
+from analyzer.store import EventStore
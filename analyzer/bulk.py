@@ -0,0 +1,236 @@
+"""Parallel import of Loot.txt archives
+
+Usage: python -m analyzer.bulk [--workers N] [--db db.json] [--history analyzer_history.db] LOG [LOG ...]
+"""
+import argparse
+import os
+import re
+import time
+from array import array
+from bisect import bisect_left
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from analyzer.catalog import Catalog
+from analyzer.database import load_database
+from analyzer.engine import LootEngine
+from analyzer.history import SessionHistory
+from analyzer.names import ItemNormalizer
+from analyzer.scan import scan_events
+from analyzer.store import NO_MONSTER, TIME_EPOCH
+
+SECTION_PATTERN = re.compile(rb'^Channel saved at', re.MULTILINE)
+BLOCK_SIZE = 16 * 1024 * 1024
+# Chunks per worker, so one slow chunk does not leave the other cores idle
+CHUNKS_PER_WORKER = 4
+
+
+def section_offsets(path, block_size=BLOCK_SIZE):
+    """Byte offsets of every "Channel saved at" line"""
+    offsets = []
+    with open(path, 'rb') as f:
+        base = 0
+        pending = b''
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            data = pending + block
+            # Only search complete lines so a header is never split between blocks
+            end = data.rfind(b'\n') + 1
+            offsets.extend(base + match.start() for match in SECTION_PATTERN.finditer(data, 0, end))
+            base += end
+            pending = data[end:]
+        if pending.startswith(b'Channel saved at'):
+            offsets.append(base)
+    return offsets
+
+
+def split_sections(path, chunks):
+    """(start, end) byte ranges of about equal size, each starting at a section
+
+    Every section starts with its own date, so the chunks can be parsed
+    independently and give the same events as one sequential parse.
+    """
+    size = os.path.getsize(path)
+    target = max(size // max(chunks, 1), 1)
+    ranges = []
+    start = 0
+    for offset in section_offsets(path):
+        if offset - start >= target:
+            ranges.append((start, offset))
+            start = offset
+    if size > start or not ranges:
+        ranges.append((start, size))
+    return ranges
+
+
+# What a worker sends back for its chunk, with ids local to the worker:
+# events parsed and the span of their times, kills per monster id and drops
+# per (monster id, item id, quantity) within the window, the same per minute
+# for the newest hour, and the events themselves only when they are kept
+ChunkCounts = namedtuple(
+    'ChunkCounts',
+    'monster_names item_names events first_time last_time latest_minute '
+    'kills drops kill_minutes loot_minutes store')
+# Events parsed from a log and the times of the first and last one
+ImportSummary = namedtuple('ImportSummary', 'events first_time last_time')
+
+
+def parse_chunk(task):
+    # Runs in a worker process: reduce one byte range to counts. The store
+    # is emptied after every batch unless the events are kept, so neither
+    # the worker nor its result grows with the size of the chunk.
+    path, start, end, start_time, window, item_names, keep_events = task
+    engine = LootEngine(start_time)
+    engine.parser.normalizer = ItemNormalizer(item_names)
+    engine.window_start, engine.window_end = window
+    store = engine.store
+    kills, drops, kill_minutes, loot_minutes = Counter(), Counter(), Counter(), Counter()
+    events = 0
+    first_time = last_time = latest = None
+    first_kill = first_loot = 0
+    for batch in scan_events(path, engine.parser, start, end):
+        engine.record(batch)
+        kill_times, loot_times = store.kill_times[first_kill:], store.loot_times[first_loot:]
+        if not kill_times and not loot_times:
+            continue
+        events += len(kill_times) + len(loot_times)
+        for times in (kill_times, loot_times):
+            if times:
+                first_time = min(times) if first_time is None else min(first_time, min(times))
+                last_time = max(times) if last_time is None else max(last_time, max(times))
+        kills.update(store.kill_counts(*window, first=first_kill))
+        drops.update(store.loot_counts(*window, first=first_loot))
+
+        # Like LootEngine.count_rates, only the newest hour is kept per minute
+        batch_latest = max(kill_times[-1] if kill_times else -1, loot_times[-1] if loot_times else -1) // 60
+        latest = batch_latest if latest is None else max(latest, batch_latest)
+        horizon = engine.advance_rates(latest)
+        kill_minutes.update(store.kill_minutes(
+            *window, first=bisect_left(store.kill_times, horizon * 60, first_kill)))
+        loot_minutes.update(store.loot_minutes(
+            *window, first=bisect_left(store.loot_times, horizon * 60, first_loot)))
+        for minutes in (kill_minutes, loot_minutes):
+            for key in [key for key in minutes if key[0] < horizon]:
+                del minutes[key]
+
+        if keep_events:
+            first_kill, first_loot = len(store.kill_times), len(store.loot_times)
+        else:
+            store.clear()
+    return ChunkCounts(engine.catalog.monsters.names, engine.catalog.items.names,
+                       events, first_time, last_time, latest,
+                       kills, drops, kill_minutes, loot_minutes, store if keep_events else None)
+
+
+def remap(store, monster_ids, item_ids):
+    # Translate a worker's store to the catalog's ids
+    store.kill_monsters = array('l', map(monster_ids.__getitem__, store.kill_monsters))
+    store.loot_monsters = array('l', map(monster_ids.__getitem__, store.loot_monsters))
+    store.loot_items = array('l', map(item_ids.__getitem__, store.loot_items))
+    return store
+
+
+def merge_counts(engine, counts):
+    # Count a worker's chunk with the engine's exclusions and prices. Names
+    # are interned in the order the worker first saw them, which is the order
+    # a sequential parse would have seen them in, so unknown names get the
+    # same ids as well.
+    catalog = engine.catalog
+    monster_ids = [catalog.monster_id(name) for name in counts.monster_names]
+    monster_ids.append(NO_MONSTER)  # NO_MONSTER (-1) indexes this last entry
+    item_ids = [catalog.item_id(name) for name in counts.item_names]
+
+    for monster, kills in counts.kills.items():
+        engine.count_kill(monster_ids[monster], kills)
+    for (monster, item, quantity), drops in counts.drops.items():
+        engine.count_loot(monster_ids[monster], item_ids[item], quantity, drops)
+    if counts.latest_minute is not None:
+        horizon = engine.advance_rates(counts.latest_minute)
+        engine.add_rates(
+            {(minute, monster_ids[monster]): kills
+             for (minute, monster), kills in counts.kill_minutes.items() if minute >= horizon},
+            {(minute, item_ids[item], quantity): drops
+             for (minute, item, quantity), drops in counts.loot_minutes.items() if minute >= horizon})
+    if counts.store is not None:
+        engine.store.extend(remap(counts.store, monster_ids, item_ids))
+
+
+def bulk_import(path, engine, workers=None, keep_events=False):
+    """Count a whole log into engine across processes
+
+    Workers send back the counts of their chunk, which are merged in file
+    order, so the engine ends up with the same counters, drop statistics
+    and rates as engine.feed() of the whole file. The events themselves
+    are only added to its store with keep_events, e.g. to save them to
+    the history. Returns an ImportSummary of the parsed events.
+    """
+    workers = workers or os.cpu_count() or 1
+    item_names = tuple(engine.catalog.item_db)
+    window = engine.window_start, engine.window_end
+    tasks = [(path, start, end, engine.start_time, window, item_names, keep_events)
+             for start, end in split_sections(path, workers * CHUNKS_PER_WORKER)]
+    events = 0
+    first_time = last_time = None
+
+    def merge(counts):
+        nonlocal events, first_time, last_time
+        merge_counts(engine, counts)
+        if counts.events:
+            events += counts.events
+            first_time = counts.first_time if first_time is None else min(first_time, counts.first_time)
+            last_time = counts.last_time if last_time is None else max(last_time, counts.last_time)
+
+    if workers == 1:
+        for counts in map(parse_chunk, tasks):
+            merge(counts)
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            for counts in pool.map(parse_chunk, tasks):
+                merge(counts)
+
+    if not events:
+        return ImportSummary(0, None, None)
+    return ImportSummary(events, TIME_EPOCH + timedelta(seconds=first_time), TIME_EPOCH + timedelta(seconds=last_time))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import Loot.txt archives")
+    parser.add_argument('logs', nargs='+', help="Loot.txt files to import")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--db', default='db.json', help="item and creature database")
+    parser.add_argument('--history', help="also save every log as a session in this SQLite history")
+    args = parser.parse_args(argv)
+
+    try:
+        catalog = Catalog(*load_database(args.db))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error loading database: {e}")
+        catalog = Catalog()
+
+    history = None
+    if args.history:
+        history = SessionHistory(args.history)
+
+    for path in args.logs:
+        started = time.perf_counter()
+        engine = LootEngine(catalog=catalog)
+        summary = bulk_import(path, engine, args.workers, keep_events=history is not None)
+        elapsed = time.perf_counter() - started
+        size = os.path.getsize(path)
+        print(f"{path}: {summary.events:,} events, {sum(engine.monster_kills.values()):,} kills, "
+              f"{engine.total_gold:,} gold, {engine.total_exp:,} exp "
+              f"({size / elapsed / 1e6:,.1f} MB/s)")
+
+        if history is not None and summary.events:
+            session_id = history.start_session(summary.first_time, path)
+            history.save_session(session_id, engine, summary.last_time)
+
+    if history is not None:
+        history.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,172 @@
+import threading
+from array import array
+
+from analyzer.names import ItemNormalizer
+
+# Coins are always worth their face value
+COIN_VALUES = {'gold coin': 1, 'platinum coin': 100, 'crystal coin': 10000}
+
+
+class NameTable:
+    """Interns lowercase names to dense integer ids
+
+    Names from db.json get the first ids; names only seen in the log (or in
+    custom prices) are appended on demand. Lookups are lock-free, only new
+    ids are allocated under a lock since the ingest worker shares the table.
+    """
+
+    def __init__(self, names=()):
+        self.ids = {}
+        self.names = []
+        self.lock = threading.Lock()
+        self.on_grow = None
+        for name in names:
+            self.id(name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def get(self, name):
+        return self.ids.get(name.lower())
+
+    def id(self, name):
+        key = name.lower()
+        index = self.ids.get(key)
+        if index is not None:
+            return index
+        with self.lock:
+            index = self.ids.get(key)
+            if index is None:
+                index = len(self.names)
+                self.names.append(key)
+                if self.on_grow is not None:
+                    self.on_grow()
+                self.ids[key] = index
+        return index
+
+
+class IdCounter:
+    """Counter stored in an array indexed by id, read by name like a dict"""
+
+    def __init__(self, table):
+        self.table = table
+        self.counts = array('q')
+        self.present = bytearray()
+
+    def grow(self, index):
+        if index >= len(self.counts):
+            extra = max(index + 1, len(self.table)) - len(self.counts)
+            self.counts.frombytes(bytes(8 * extra))
+            self.present.extend(bytes(extra))
+
+    def add_id(self, index, amount):
+        if index >= len(self.counts):
+            self.grow(index)
+        self.counts[index] += amount
+        self.present[index] = 1
+
+    def add(self, name, amount=1):
+        self.add_id(self.table.id(name), amount)
+
+    def index(self, name):
+        index = self.table.get(str(name))
+        if index is None or index >= len(self.present) or not self.present[index]:
+            return None
+        return index
+
+    def __contains__(self, name):
+        return self.index(name) is not None
+
+    def __getitem__(self, name):
+        index = self.index(name)
+        if index is None:
+            raise KeyError(name)
+        return self.counts[index]
+
+    def get(self, name, default=None):
+        index = self.index(name)
+        return default if index is None else self.counts[index]
+
+    def ids(self):
+        return [index for index, flag in enumerate(self.present) if flag]
+
+    def values(self):
+        return [self.counts[index] for index in self.ids()]
+
+    def items(self):
+        names = self.table.names
+        counts = self.counts
+        return [(names[index], counts[index]) for index in self.ids()]
+
+    def clear(self):
+        self.counts = array('q', bytes(8 * len(self.counts)))
+        self.present = bytearray(len(self.present))
+
+
+class Catalog:
+    """Items and creatures from db.json with ids and parallel price/exp vectors"""
+
+    def __init__(self, item_db=None, creature_db=None, custom_item_prices=None):
+        self.item_db = item_db or {}
+        self.creature_db = creature_db or {}
+        self.items = NameTable()
+        self.monsters = NameTable()
+        self.base_item_prices = array('q')
+        self.item_prices = array('q')  # db price overridden by coins and custom prices
+        self.monster_exp = array('q')
+        self.items.on_grow = self.grow_items
+        self.monsters.on_grow = self.grow_monsters
+
+        for name, item in sorted(self.item_db.items()):
+            index = self.items.id(name)
+            self.base_item_prices[index] = self.item_prices[index] = int(item.get('price', 0) or 0)
+        for name, value in COIN_VALUES.items():
+            index = self.items.id(name)
+            self.base_item_prices[index] = self.item_prices[index] = value
+        for name, creature in sorted(self.creature_db.items()):
+            self.monster_exp[self.monsters.id(name)] = int(creature.get('exp', 0) or 0)
+
+        self.custom_item_prices = {}
+        self.set_custom_prices(custom_item_prices or {})
+        # Loot entries resolve to db.json names before falling back to plural rules
+        self.normalizer = ItemNormalizer(self.item_db)
+
+    def grow_items(self):
+        # Unknown items are worth nothing until a custom price is set
+        self.base_item_prices.append(0)
+        self.item_prices.append(0)
+
+    def grow_monsters(self):
+        self.monster_exp.append(0)
+
+    def item_id(self, item_name):
+        return self.items.id(item_name)
+
+    def monster_id(self, monster_name):
+        return self.monsters.id(monster_name)
+
+    def get_item_price(self, item_name):
+        index = self.items.get(str(item_name))
+        return 0 if index is None else self.item_prices[index]
+
+    def get_monster_exp(self, monster_name):
+        index = self.monsters.get(str(monster_name))
+        return 0 if index is None else self.monster_exp[index]
+
+    def set_custom_price(self, item_name, price):
+        self.custom_item_prices[item_name] = price
+        name = str(item_name).lower()
+        if name not in COIN_VALUES:
+            self.item_prices[self.items.id(name)] = price
+
+    def remove_custom_price(self, item_name):
+        self.custom_item_prices.pop(item_name, None)
+        index = self.items.get(str(item_name))
+        if index is not None:
+            self.item_prices[index] = self.base_item_prices[index]
+
+    def set_custom_prices(self, custom_item_prices):
+        for item_name in list(self.custom_item_prices):
+            self.remove_custom_price(item_name)
+        for item_name, price in custom_item_prices.items():
+            self.set_custom_price(item_name, price)
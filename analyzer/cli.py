@@ -0,0 +1,105 @@
+"""Headless session reports from Loot.txt files
+
+Usage: python -m analyzer [--since TIME] [--until TIME] [--exclusions FILE] [--prices FILE]
+                          [--db db.json] [--format text|json] [--output FILE] LOG [LOG ...]
+"""
+import argparse
+import json
+import sys
+from datetime import datetime
+
+from analyzer.bulk import bulk_import
+from analyzer.catalog import Catalog
+from analyzer.database import load_database
+from analyzer.engine import LootEngine
+from analyzer.report import report_data, write_report
+
+
+def load_json(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def load_exclusions(path):
+    # Same keys as the window's analyzer_settings.json, which can be used as is
+    settings = load_json(path)
+    return settings.get('excluded_items', []), settings.get('excluded_monsters', [])
+
+
+def load_prices(path):
+    # Either {item: price} or a settings file with its custom_prices
+    prices = load_json(path)
+    if isinstance(prices.get('custom_prices'), dict):
+        prices = prices['custom_prices']
+    return {item.lower(): int(price) for item, price in prices.items()}
+
+
+def session_seconds(summary, since=None, until=None):
+    # The requested window, or the span of the parsed events where it is open
+    if not summary.events:
+        return 0
+    start = since or summary.first_time
+    end = until or summary.last_time
+    return max((end - start).total_seconds(), 0)
+
+
+def analyze(path, catalog, since=None, until=None, excluded_items=(), excluded_monsters=(), workers=None):
+    """The engine with the counts of one log, and the ImportSummary of its events"""
+    engine = LootEngine(since, excluded_items, excluded_monsters, catalog)
+    engine.set_window(since, until)
+    return engine, bulk_import(path, engine, workers)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m analyzer', description="Summarize hunting sessions from Loot.txt files")
+    parser.add_argument('logs', nargs='+', help="Loot.txt files, one session each")
+    parser.add_argument('--since', type=datetime.fromisoformat, help="count lines from this time on (YYYY-MM-DD HH:MM)")
+    parser.add_argument('--until', type=datetime.fromisoformat, help="count lines before this time")
+    parser.add_argument('--exclusions', help="JSON file with excluded_items and excluded_monsters lists")
+    parser.add_argument('--prices', help="JSON file with custom item prices")
+    parser.add_argument('--db', default='db.json', help="item and creature database")
+    parser.add_argument('--format', choices=('text', 'json'), default='text')
+    parser.add_argument('--output', help="write the reports to this file instead of stdout")
+    parser.add_argument('--workers', type=int, default=None, help="processes per log (default: all cores)")
+    args = parser.parse_args(argv)
+
+    try:
+        item_db, creature_db = load_database(args.db)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error loading database: {e}", file=sys.stderr)
+        item_db, creature_db = {}, {}
+    try:
+        excluded_items, excluded_monsters = load_exclusions(args.exclusions) if args.exclusions else ((), ())
+        custom_prices = load_prices(args.prices) if args.prices else {}
+    except (OSError, ValueError, AttributeError) as e:
+        parser.error(f"could not read settings: {e}")
+    catalog = Catalog(item_db, creature_db, custom_prices)
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    failed = 0
+    try:
+        reports = []
+        for path in args.logs:
+            try:
+                engine, summary = analyze(path, catalog, args.since, args.until, excluded_items, excluded_monsters, args.workers)
+            except OSError as e:
+                print(f"Error reading {path}: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            elapsed_seconds = session_seconds(summary, args.since, args.until)
+
+            if args.format == 'json':
+                reports.append(dict(report_data(engine, elapsed_seconds), log=path))
+            else:
+                output.write(f"== {path} ==\n")
+                write_report(output, engine, elapsed_seconds)
+                output.write("\n")
+
+        if args.format == 'json':
+            json.dump(reports, output, indent=2)
+            output.write("\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    # Nonzero when any log could not be read, so scripts notice broken runs
+    return 1 if failed else 0
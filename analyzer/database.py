@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import pickle
+
+# Bump when the cached layout changes
+CACHE_VERSION = 1
+# Sections the analyzer reads on every start; the rest are unpickled on demand
+EAGER_SECTIONS = ('items', 'creatures')
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+class Database:
+    """db.json with its items and creatures keyed by lowercase name
+
+    The parsed file is cached as a pickle keyed by the source's mtime, size
+    and hash. Items and creatures are stored ready to use; every other
+    section is kept as its own pickled blob and only unpickled by section().
+    """
+
+    def __init__(self, item_db, creature_db, sections):
+        self.item_db = item_db
+        self.creature_db = creature_db
+        self.sections = sections  # Format: {name: pickled section}
+        self.loaded_sections = {}
+
+    @classmethod
+    def from_json(cls, data):
+        item_db = {item['name'].lower(): item for item in data['items']}
+        creature_db = {creature['name'].lower(): creature for creature in data['creatures']}
+        sections = {name: pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+                    for name, value in data.items() if name not in EAGER_SECTIONS}
+        return cls(item_db, creature_db, sections)
+
+    @classmethod
+    def load(cls, path, cache_path=None):
+        """Load db.json, through the cache when it is still valid"""
+        cache_path = cache_path or path + '.cache'
+        stat = os.stat(path)
+        cache = cls.read_cache(cache_path)
+
+        if cache is not None and (cache['mtime_ns'], cache['size']) == (stat.st_mtime_ns, stat.st_size):
+            return cls(cache['items'], cache['creatures'], cache['sections'])
+
+        # A touched but unchanged file keeps its cache, only the key is refreshed
+        source_hash = file_hash(path)
+        if cache is not None and cache['sha1'] == source_hash:
+            database = cls(cache['items'], cache['creatures'], cache['sections'])
+        else:
+            with open(path, 'r') as f:
+                database = cls.from_json(json.load(f))
+        database.write_cache(cache_path, stat, source_hash)
+        return database
+
+    @staticmethod
+    def read_cache(cache_path):
+        try:
+            with open(cache_path, 'rb') as f:
+                cache = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+            return None
+        if not isinstance(cache, dict) or cache.get('version') != CACHE_VERSION:
+            return None
+        return cache
+
+    def write_cache(self, cache_path, stat, source_hash):
+        cache = {
+            'version': CACHE_VERSION,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha1': source_hash,
+            'items': self.item_db,
+            'creatures': self.creature_db,
+            'sections': self.sections,
+        }
+        temp_path = cache_path + '.tmp'
+        try:
+            with open(temp_path, 'wb') as f:
+                pickle.dump(cache, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            # A read-only install still works, it just parses the JSON every time
+            print(f"Could not write database cache: {e}")
+
+    def section(self, name):
+        """Any other db.json section (e.g. 'npcs'), unpickled on first use"""
+        if name not in self.loaded_sections:
+            self.loaded_sections[name] = pickle.loads(self.sections[name])
+        return self.loaded_sections[name]
+
+
+def load_database(path, cache_path=None):
+    """Items and creatures of db.json, keyed by lowercase name"""
+    database = Database.load(path, cache_path)
+    return database.item_db, database.creature_db
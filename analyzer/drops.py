@@ -0,0 +1,64 @@
+class DropStats:
+    """Streaming statistics for the quantities of one item dropped by one monster
+
+    Keeps count, sum, sum of squares, min and max instead of every drop, plus
+    a histogram of the first few distinct quantities seen.
+    """
+
+    __slots__ = ('count', 'total', 'total_squares', 'min', 'max', 'histogram')
+
+    MAX_HISTOGRAM_SIZE = 16
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.total_squares = 0
+        self.min = None
+        self.max = None
+        self.histogram = {}
+
+    def __len__(self):
+        # Number of drops, so len() works as it did for the old per-drop lists
+        return self.count
+
+    def add(self, quantity, drops=1):
+        self.count += drops
+        self.total += quantity * drops
+        self.total_squares += quantity * quantity * drops
+        if self.min is None or quantity < self.min:
+            self.min = quantity
+        if self.max is None or quantity > self.max:
+            self.max = quantity
+        if quantity in self.histogram or len(self.histogram) < self.MAX_HISTOGRAM_SIZE:
+            self.histogram[quantity] = self.histogram.get(quantity, 0) + drops
+
+    def merge(self, other):
+        if not other.count:
+            return
+        self.count += other.count
+        self.total += other.total
+        self.total_squares += other.total_squares
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        for quantity, drops in other.histogram.items():
+            if quantity in self.histogram or len(self.histogram) < self.MAX_HISTOGRAM_SIZE:
+                self.histogram[quantity] = self.histogram.get(quantity, 0) + drops
+
+    def __eq__(self, other):
+        if not isinstance(other, DropStats):
+            return NotImplemented
+        return (self.count, self.total, self.total_squares, self.min, self.max, self.histogram) == \
+            (other.count, other.total, other.total_squares, other.min, other.max, other.histogram)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    @property
+    def variance(self):
+        if not self.count:
+            return 0
+        return max(self.total_squares / self.count - self.mean ** 2, 0)
+
+    def quantity_range(self):
+        return f"{self.min}-{self.max}" if self.min != self.max else str(self.min)
@@ -0,0 +1,423 @@
+import re
+from bisect import bisect_left
+from collections import namedtuple
+from datetime import datetime, timedelta
+
+from analyzer.catalog import Catalog, IdCounter
+from analyzer.drops import DropStats
+from analyzer.names import ItemNormalizer
+from analyzer.rates import RollingRates
+from analyzer.store import NO_MONSTER, NO_OFFSET, EventStore, window_key
+from analyzer.totals import dot
+
+# Classifies a Loot.txt line and extracts its fields in a single match.
+# The lastgroup of a match tells which kind of line it was.
+LINE_PATTERN = re.compile(
+    r'Channel saved at (?P<saved>.+)'
+    r'|(?P<hour>\d{2}):(?P<minute>\d{2})(?:.*?(?:'
+    r'Loot of (?P<loot_monster>[^:]+): (?P<loot_items>.*)'
+    r'|Content of a bag within the corpse of (?P<bag_monster>[^:]+): (?P<bag_items>.*)'
+    r'|Looted (?P<points>\d+) (?P<point_type>\w+) points?'
+    r'))?'
+)
+SECTION_DATE_FORMAT = '%a %b %d %H:%M:%S %Y'
+
+# A monster corpse was opened (only regular loot lines count as kills).
+# offset is the byte offset of the source line when the parser was given one.
+KillEvent = namedtuple('KillEvent', 'timestamp monster offset', defaults=(None,))
+# An item was looted; monster is None for event points
+LootEvent = namedtuple('LootEvent', 'timestamp monster item quantity offset', defaults=(None,))
+
+
+def line_datetime(section_datetime, hour, minute):
+    # Combine the section date with the line time
+    result = section_datetime.replace(
+        hour=hour,
+        minute=minute,
+        second=0,
+        microsecond=0
+    )
+
+    # Lines written just before midnight belong to the previous day
+    if section_datetime.hour == 0 and hour == 23:
+        result -= timedelta(days=1)
+    return result
+
+
+class LogParser:
+    """Turns raw Loot.txt content into kill and loot events"""
+
+    def __init__(self, start_time=None, normalizer=None):
+        # Without item names the normalizer falls back to the plural rules
+        self.normalizer = normalizer if normalizer is not None else ItemNormalizer()
+        self.reset(start_time)
+
+    def reset(self, start_time=None, section_datetime=None):
+        # section_datetime primes the parser when it starts mid-section
+        self.start_time = start_time
+        self.log_section_datetime = section_datetime
+        self.line_datetime_key = None
+        self.last_line_datetime = None
+
+    def feed(self, data, offset=None):
+        # With the file offset of raw bytes, events carry their line offset
+        if offset is not None and isinstance(data, bytes):
+            return self.feed_lines(data, offset)
+
+        if isinstance(data, bytes):
+            data = data.decode('utf-8', errors='replace')
+
+        events = []
+        for line in data.splitlines():
+            events.extend(self.parse_line(line))
+        return events
+
+    def feed_lines(self, data, offset):
+        events = []
+        for line in data.split(b'\n'):
+            if line:
+                events.extend(self.parse_line(line.decode('utf-8', errors='replace').rstrip('\r'), offset))
+            offset += len(line) + 1
+        return events
+
+    def parse_line(self, line, offset=None):
+        match = LINE_PATTERN.match(line)
+        if match is None:
+            return ()
+        kind = match.lastgroup
+
+        # Extract channel saved date
+        if kind == 'saved':
+            date_str = match.group('saved').strip()
+            try:
+                self.log_section_datetime = datetime.strptime(date_str, SECTION_DATE_FORMAT)
+            except ValueError as e:
+                print(f"ValueError: {e}, Line: {line}")
+            self.line_datetime_key = None
+            return ()
+
+        # Skip if we haven't found a channel saved date yet, or nothing to count
+        if not self.log_section_datetime or kind == 'minute':
+            return ()
+
+        # Consecutive lines usually share the same minute
+        line_time_key = match.group('hour', 'minute')
+        if line_time_key != self.line_datetime_key:
+            try:
+                line_datetime = self.line_datetime(int(line_time_key[0]), int(line_time_key[1]))
+            except ValueError as e:
+                print(f"ValueError: {e}, Line: {line}")
+                return ()
+            self.line_datetime_key = line_time_key
+            self.last_line_datetime = line_datetime
+        else:
+            line_datetime = self.last_line_datetime
+
+        # Only lines after the session start are counted
+        if self.start_time is not None and line_datetime < self.start_time:
+            return ()
+
+        if kind == 'loot_items':
+            monster_name = match.group('loot_monster').strip()
+            events = [KillEvent(line_datetime, monster_name, offset)]
+            events.extend(self.process_items(match.group('loot_items').strip(), monster_name, line_datetime, offset))
+            return events
+
+        if kind == 'bag_items':
+            monster_name = match.group('bag_monster').strip()
+            return self.process_items(match.group('bag_items').strip(), monster_name, line_datetime, offset)
+
+        point_type = f"{match.group('point_type').lower()} point"
+        return [LootEvent(line_datetime, None, point_type, int(match.group('points')), offset)]
+
+    def line_datetime(self, hour, minute):
+        return line_datetime(self.log_section_datetime, hour, minute)
+
+    def process_items(self, items_text, monster_name=None, timestamp=None, offset=None):
+        events = []
+        resolve = self.normalizer.resolve
+        for item in items_text.lower().split(','):
+            resolved = resolve(item)
+            if resolved is not None:
+                events.append(LootEvent(timestamp, monster_name, resolved[0], resolved[1], offset))
+        return events
+
+
+class LootEngine:
+    """Session counters built from parsed events, independent of any UI
+
+    Every applied event is also recorded in an EventStore, so exclusion
+    and time window changes re-aggregate the stored events instead of
+    parsing the log again. Gold and exp of the last hour of log time are
+    also bucketed per minute in RollingRates for the 5/15/60 minute rates.
+    """
+
+    def __init__(self, start_time=None, excluded_items=(), excluded_monsters=(), catalog=None):
+        # Names are interned to catalog ids; engines merged together share a catalog
+        self.catalog = catalog if catalog is not None else Catalog()
+        self.parser = LogParser(start_time, self.catalog.normalizer)
+        self.store = EventStore()
+        # Counted window within the stored events; None means unbounded
+        self.window_start = None
+        self.window_end = None
+        self.total_gold = 0
+        self.total_exp = 0
+        self.set_excluded_items(excluded_items)
+        self.set_excluded_monsters(excluded_monsters)
+        self.monster_kills = IdCounter(self.catalog.monsters)
+        self.loot_counts = IdCounter(self.catalog.items)
+        self.monster_drops = {}  # Format: {monster_name: {item_name: DropStats}}
+        self.item_sources = {}   # Format: {item_name: set(monster_names)}
+        self.rates = RollingRates()
+
+    @property
+    def start_time(self):
+        return self.parser.start_time
+
+    def reset(self, start_time=None):
+        self.parser.reset(start_time)
+        self.window_start = None
+        self.window_end = None
+        self.store.clear()
+        self.clear()
+
+    def clear(self):
+        self.monster_kills.clear()
+        self.loot_counts.clear()
+        self.monster_drops.clear()
+        self.item_sources.clear()
+        self.rates.clear()
+        self.total_gold = 0
+        self.total_exp = 0
+
+    def feed(self, data, offset=None):
+        events = self.parser.feed(data, offset)
+        self.apply(events)
+        return events
+
+    def apply(self, events):
+        store = self.store
+        first_kill = len(store.kill_times)
+        first_loot = len(store.loot_times)
+        self.record(events)
+        # Count the new events grouped by distinct drop rather than one by one
+        self.aggregate(store, first_kill, first_loot)
+
+    def record(self, events):
+        # Append events to the store columns; this loop runs for every parsed
+        # event, so the column appends and id lookups are bound locally
+        store = self.store
+        monster_id = self.catalog.monster_id
+        item_id = self.catalog.item_id
+        kill_time, kill_monster, kill_offset = \
+            store.kill_times.append, store.kill_monsters.append, store.kill_offsets.append
+        loot_time, loot_monster, loot_item, loot_quantity, loot_offset = \
+            store.loot_times.append, store.loot_monsters.append, store.loot_items.append, \
+            store.loot_quantities.append, store.loot_offsets.append
+        time_key = store.time_key
+        for event in events:
+            offset = NO_OFFSET if event.offset is None else event.offset
+            if type(event) is KillEvent:
+                kill_time(time_key(event.timestamp))
+                kill_monster(monster_id(event.monster))
+                kill_offset(offset)
+            else:
+                loot_time(time_key(event.timestamp))
+                loot_monster(NO_MONSTER if event.monster is None else monster_id(event.monster))
+                loot_item(item_id(event.item))
+                loot_quantity(event.quantity)
+                loot_offset(offset)
+
+    def count_kill(self, monster_id, kills=1):
+        monster_name = self.catalog.monsters.names[monster_id]
+
+        # Initialize monster tracking
+        if monster_name not in self.monster_drops:
+            self.monster_drops[monster_name] = {}
+
+        # Update monster kills only if not excluded
+        if monster_name not in self.excluded_monsters:
+            self.monster_kills.add_id(monster_id, kills)
+            self.total_exp += kills * self.catalog.monster_exp[monster_id]
+
+    def count_loot(self, monster_id, item_id, quantity, drops=1):
+        item_name = self.catalog.items.names[item_id]
+        if item_name in self.excluded_items:
+            return
+
+        # Track each drop as a single instance with its quantity
+        if monster_id != NO_MONSTER:
+            monster_name = self.catalog.monsters.names[monster_id]
+            monster_drops = self.monster_drops.setdefault(monster_name, {})
+            stats = monster_drops.get(item_name)
+            if stats is None:
+                stats = monster_drops[item_name] = DropStats()
+            stats.add(quantity, drops)
+
+            # Track item sources
+            self.item_sources.setdefault(item_name, set()).add(monster_name)
+
+        # Update total counts
+        self.loot_counts.add_id(item_id, quantity * drops)
+        self.total_gold += quantity * drops * self.catalog.item_prices[item_id]
+
+    def aggregate(self, store, first_kill=0, first_loot=0):
+        # Count a store's events from the given positions on, with this
+        # engine's exclusions and window, each distinct drop counted once
+        window = self.window_start, self.window_end
+        for monster_id, kills in store.kill_counts(*window, first=first_kill).items():
+            self.count_kill(monster_id, kills)
+        for (monster_id, item_id, quantity), drops in store.loot_counts(*window, first=first_loot).items():
+            self.count_loot(monster_id, item_id, quantity, drops)
+        self.count_rates(store, first_kill, first_loot)
+
+    def count_rates(self, store, first_kill=0, first_loot=0):
+        # Bucket the gold and exp of a store's events from the given positions
+        # on; only events within the longest window of the newest minute can
+        # count, and the columns are in log order, so older rows are skipped
+        latest = max(store.kill_times[-1] if len(store.kill_times) > first_kill else -1,
+                     store.loot_times[-1] if len(store.loot_times) > first_loot else -1) // 60
+        if latest < 0:
+            return
+        horizon = self.advance_rates(latest) * 60
+        first_kill = bisect_left(store.kill_times, horizon, first_kill)
+        first_loot = bisect_left(store.loot_times, horizon, first_loot)
+
+        window = self.window_start, self.window_end
+        self.add_rates(store.kill_minutes(*window, first=first_kill), store.loot_minutes(*window, first=first_loot))
+
+    def advance_rates(self, latest):
+        # Move the rates to latest, the minute of the newest event, or to the
+        # last minute of the window if that is earlier, so buckets of an older
+        # part of the log leave them; returns the oldest minute they still hold
+        rates = self.rates
+        if self.window_end is not None:
+            # The end is exclusive, so a window ending on a full minute stops
+            # at the minute before it
+            latest = min(latest, (window_key(self.window_end) - 1) // 60)
+        rates.advance(latest)
+        return rates.minute - rates.size + 1
+
+    def add_rates(self, kill_minutes, loot_minutes):
+        # Kills per (minute, monster id) and drops per (minute, item id, quantity)
+        rates = self.rates
+        monster_names = self.catalog.monsters.names
+        monster_exp = self.catalog.monster_exp
+        for (minute, monster_id), kills in kill_minutes.items():
+            if monster_names[monster_id] not in self.excluded_monsters:
+                rates.add(minute, exp=kills * monster_exp[monster_id])
+        item_names = self.catalog.items.names
+        item_prices = self.catalog.item_prices
+        for (minute, item_id, quantity), drops in loot_minutes.items():
+            if item_names[item_id] not in self.excluded_items:
+                rates.add(minute, gold=quantity * drops * item_prices[item_id])
+
+    def recount_rates(self):
+        self.rates.clear()
+        self.count_rates(self.store)
+
+    def rebuild(self):
+        """Recount the stored events, e.g. after the exclusions changed"""
+        self.clear()
+        self.aggregate(self.store)
+
+    def set_window(self, start_time=None, end_time=None):
+        """Count only stored events in [start_time, end_time)
+
+        Returns False when start_time is before the parser's start time,
+        since those events were never parsed and the log must be read again.
+        """
+        if start_time is not None and self.start_time is not None and start_time < self.start_time:
+            return False
+        self.window_start = start_time
+        self.window_end = end_time
+        self.rebuild()
+        return True
+
+    def merge(self, other):
+        # Fold another engine's events and counters into this one (e.g. a
+        # parsed chunk). Both engines must share the same catalog so their
+        # ids line up. Counters are only reused when the other engine counted
+        # with the same filters, otherwise its stored events are recounted.
+        self.store.extend(other.store)
+        if (self.window_start is not None or self.window_end is not None
+                or other.excluded_items != self.excluded_items
+                or other.excluded_monsters != self.excluded_monsters):
+            self.aggregate(other.store)
+            return
+
+        monster_names = self.catalog.monsters.names
+        for monster_id in other.monster_kills.ids():
+            if monster_names[monster_id] not in self.excluded_monsters:
+                kills = other.monster_kills.counts[monster_id]
+                self.monster_kills.add_id(monster_id, kills)
+                self.total_exp += kills * self.catalog.monster_exp[monster_id]
+        item_names = self.catalog.items.names
+        for item_id in other.loot_counts.ids():
+            if item_names[item_id] not in self.excluded_items:
+                count = other.loot_counts.counts[item_id]
+                self.loot_counts.add_id(item_id, count)
+                self.total_gold += count * self.catalog.item_prices[item_id]
+        for monster, drops in other.monster_drops.items():
+            own_drops = self.monster_drops.setdefault(monster, {})
+            for item, stats in drops.items():
+                if item not in self.excluded_items:
+                    if item not in own_drops:
+                        own_drops[item] = DropStats()
+                    own_drops[item].merge(stats)
+        for item, monsters in other.item_sources.items():
+            if item not in self.excluded_items:
+                self.item_sources.setdefault(item, set()).update(monsters)
+        self.count_rates(other.store)
+
+    # Exclusions are immutable lowercase sets, rebuilt only when they change,
+    # so per-line lookups are O(1) and the sets can be shared between threads
+    def set_excluded_items(self, item_names):
+        self.excluded_items = frozenset(str(name).strip().lower() for name in item_names)
+
+    def set_excluded_monsters(self, monster_names):
+        self.excluded_monsters = frozenset(str(name).strip().lower() for name in monster_names)
+
+    # Exclusion edits recount the stored events, so including a name again
+    # brings back its counts without reading the log
+    def exclude_item(self, item_name):
+        self.set_excluded_items(self.excluded_items | {item_name.strip().lower()})
+        self.rebuild()
+
+    def exclude_monster(self, monster_name):
+        self.set_excluded_monsters(self.excluded_monsters | {monster_name.strip().lower()})
+        self.rebuild()
+
+    def include_item(self, item_name):
+        self.set_excluded_items(self.excluded_items - {item_name.strip().lower()})
+        self.rebuild()
+
+    def include_monster(self, monster_name):
+        self.set_excluded_monsters(self.excluded_monsters - {monster_name.strip().lower()})
+        self.rebuild()
+
+    # Price changes are applied to the running total as a delta
+    def set_custom_price(self, item_name, price):
+        old_price = self.catalog.get_item_price(item_name)
+        self.catalog.set_custom_price(item_name, price)
+        self.reprice_item(item_name, old_price)
+
+    def remove_custom_price(self, item_name):
+        old_price = self.catalog.get_item_price(item_name)
+        self.catalog.remove_custom_price(item_name)
+        self.reprice_item(item_name, old_price)
+
+    def set_custom_prices(self, custom_item_prices):
+        self.catalog.set_custom_prices(custom_item_prices)
+        self.recalculate_totals()
+
+    def reprice_item(self, item_name, old_price):
+        count = self.loot_counts.get(item_name, 0)
+        self.total_gold += count * (self.catalog.get_item_price(item_name) - old_price)
+        self.recount_rates()
+
+    def recalculate_totals(self):
+        # Dot products of the id-indexed counters with the price/exp vectors
+        self.total_gold = dot(self.loot_counts.counts, self.catalog.item_prices)
+        self.total_exp = dot(self.monster_kills.counts, self.catalog.monster_exp)
+        self.recount_rates()
@@ -0,0 +1,163 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import sys
+import time
+
+
+class Inotify:
+    """Minimal inotify watch on a directory through libc (Linux only)"""
+
+    IN_MODIFY = 0x002
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+    def __init__(self, directory):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        # Watching the directory also catches the log being rotated or recreated
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), self.WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def fileno(self):
+        return self.fd
+
+    def drain(self):
+        # Consume pending events without blocking, True if there were any
+        changed = False
+        while True:
+            try:
+                if not os.read(self.fd, 4096):
+                    return changed
+            except BlockingIOError:
+                return changed
+            changed = True
+
+    def wait(self, timeout):
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        return self.drain() if readable else False
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class LogFollower:
+    """Incremental reader for a growing log file
+
+    Wakes on inotify events when available and falls back to stat polling
+    with an adaptive interval. Only complete lines are returned; a partial
+    final line is kept until its newline is written. A new inode or a file
+    smaller than the read position restarts reading from the beginning.
+    """
+
+    def __init__(self, path, min_interval=0.1, max_interval=1.0, use_inotify=True):
+        self.path = path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.position = 0
+        self.partial = b''
+        self.inode = None
+        self.last_stat = None
+
+        self.inotify = None
+        directory = os.path.dirname(os.path.abspath(path))
+        if use_inotify and sys.platform.startswith('linux') and os.path.isdir(directory):
+            try:
+                self.inotify = Inotify(directory)
+            except (OSError, AttributeError) as e:
+                print(f"Falling back to polling {path}: {e}")
+
+    def rewind(self, position=0):
+        self.position = position
+        self.partial = b''
+        self.last_stat = None
+
+    @property
+    def line_position(self):
+        # File offset just past the last line returned by read()
+        return self.position - len(self.partial)
+
+    def stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def pending(self):
+        # Bytes known to be written but not read yet
+        if self.last_stat is None:
+            return 0
+        return max(self.last_stat[1] - self.position, 0)
+
+    def poll(self):
+        # Cheap check whether read() could return anything new
+        if self.inotify is not None:
+            return self.inotify.drain() or self.last_stat is None
+        if self.stat() != self.last_stat:
+            return True
+
+        # Nothing new, back off the polling interval
+        self.interval = min(self.interval * 2, self.max_interval)
+        return False
+
+    def wait(self, timeout=None):
+        # Block until the log may have changed or the polling interval passed
+        if self.inotify is not None:
+            timeout = self.max_interval if timeout is None else timeout
+            return self.inotify.wait(timeout) or self.last_stat is None
+        time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+        return self.poll()
+
+    def read(self, max_bytes=None):
+        stat = self.stat()
+        self.last_stat = stat
+        if stat is None:
+            return b''
+        inode, size, _ = stat
+
+        # Rotated or truncated: start over from the beginning of the new file
+        if (self.inode is not None and inode != self.inode) or size < self.position:
+            self.rewind()
+            self.last_stat = stat
+        self.inode = inode
+
+        if size == self.position:
+            return b''
+
+        # Large backlogs can be consumed in several bounded reads
+        length = size - self.position
+        if max_bytes is not None:
+            length = min(length, max_bytes)
+
+        with open(self.path, 'rb') as file:
+            file.seek(self.position)
+            data = file.read(length)
+            self.position += len(data)
+        self.interval = self.min_interval
+
+        data = self.partial + data
+        end = data.rfind(b'\n') + 1
+        self.partial = data[end:]
+        return data[:end]
+
+    def close(self):
+        if self.inotify is not None:
+            self.inotify.close()
+            self.inotify = None
@@ -0,0 +1,350 @@
+import os
+import shutil
+import sqlite3
+import threading
+from collections import namedtuple
+from datetime import timedelta
+from itertools import count, islice
+
+from analyzer.store import NO_MONSTER, TIME_EPOCH
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    ended_at TEXT NOT NULL,
+    log_path TEXT,
+    total_gold INTEGER NOT NULL DEFAULT 0,
+    total_exp INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS monsters (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS items (id INTEGER PRIMARY KEY, name TEXT NOT NULL UNIQUE);
+CREATE TABLE IF NOT EXISTS kills (
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    timestamp TEXT NOT NULL,
+    monster_id INTEGER NOT NULL REFERENCES monsters(id)
+);
+CREATE TABLE IF NOT EXISTS loot (
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    timestamp TEXT NOT NULL,
+    monster_id INTEGER REFERENCES monsters(id),
+    item_id INTEGER NOT NULL REFERENCES items(id),
+    quantity INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS session_monsters (
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    monster_id INTEGER NOT NULL REFERENCES monsters(id),
+    kills INTEGER NOT NULL,
+    exp INTEGER NOT NULL,
+    PRIMARY KEY (session_id, monster_id)
+);
+CREATE TABLE IF NOT EXISTS session_items (
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    item_id INTEGER NOT NULL REFERENCES items(id),
+    quantity INTEGER NOT NULL,
+    gold INTEGER NOT NULL,
+    PRIMARY KEY (session_id, item_id)
+);
+CREATE INDEX IF NOT EXISTS kills_session_monster ON kills (session_id, monster_id);
+CREATE INDEX IF NOT EXISTS kills_timestamp ON kills (timestamp);
+CREATE INDEX IF NOT EXISTS loot_session_monster ON loot (session_id, monster_id);
+CREATE INDEX IF NOT EXISTS loot_session_item ON loot (session_id, item_id);
+CREATE INDEX IF NOT EXISTS loot_timestamp ON loot (timestamp);
+CREATE INDEX IF NOT EXISTS kills_monster ON kills (monster_id);
+CREATE INDEX IF NOT EXISTS loot_item_monster ON loot (item_id, monster_id);
+CREATE INDEX IF NOT EXISTS sessions_started_at ON sessions (started_at);
+"""
+
+HISTORY_FILE = 'analyzer_history.db'
+
+# Rows per executemany call; a whole save is still one transaction
+BATCH_SIZE = 10000
+
+
+# What a save writes, taken from the engine on the thread that owns it.
+# Events are copies of the store columns from the first unsaved row on; the
+# name lists are the catalog's own, which only ever grow.
+SessionSnapshot = namedtuple(
+    'SessionSnapshot',
+    'ended_at total_gold total_exp monster_names item_names kill_times kill_monsters '
+    'loot_times loot_monsters loot_items loot_quantities monsters items')
+
+
+def take_snapshot(engine, ended_at, first_kill=0, first_loot=0):
+    store, catalog = engine.store, engine.catalog
+    return SessionSnapshot(
+        ended_at, engine.total_gold, engine.total_exp,
+        catalog.monsters.names, catalog.items.names,
+        store.kill_times[first_kill:], store.kill_monsters[first_kill:],
+        store.loot_times[first_loot:], store.loot_monsters[first_loot:],
+        store.loot_items[first_loot:], store.loot_quantities[first_loot:],
+        [(index, kills, kills * catalog.monster_exp[index])
+         for index, kills in zip(engine.monster_kills.ids(), engine.monster_kills.values())],
+        [(index, quantity, quantity * catalog.item_prices[index])
+         for index, quantity in zip(engine.loot_counts.ids(), engine.loot_counts.values())])
+
+
+def unsaved_positions(engine, positions):
+    # The engine store restarts empty after a reset
+    first_kill, first_loot = positions
+    if first_kill > len(engine.store.kill_times) or first_loot > len(engine.store.loot_times):
+        return 0, 0
+    return first_kill, first_loot
+
+
+def format_timestamp(timestamp):
+    return timestamp.isoformat(sep=' ', timespec='seconds')
+
+
+def batches(rows, size=BATCH_SIZE):
+    rows = iter(rows)
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+class SessionHistory:
+    """SQLite database of every session's events and totals
+
+    Sessions are saved incrementally: each save inserts the events the
+    engine stored since the previous save and replaces the session's
+    per-monster and per-item aggregates, all in one transaction.
+    Timestamps are stored as 'YYYY-MM-DD HH:MM:SS' text so SQLite's date
+    functions and plain string comparisons both work on them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+        self.name_ids = {'monsters': {}, 'items': {}}
+        self.saved_positions = {}  # Format: {session_id: (kills, loot)} rows already saved
+
+    def close(self):
+        self.connection.close()
+
+    def start_session(self, started_at, log_path=None):
+        with self.connection:
+            cursor = self.connection.execute(
+                'INSERT INTO sessions (started_at, ended_at, log_path) VALUES (?, ?, ?)',
+                (format_timestamp(started_at), format_timestamp(started_at), log_path))
+        self.saved_positions[cursor.lastrowid] = (0, 0)
+        return cursor.lastrowid
+
+    def name_id(self, table, name):
+        ids = self.name_ids[table]
+        name_id = ids.get(name)
+        if name_id is None:
+            self.connection.execute(f'INSERT OR IGNORE INTO {table} (name) VALUES (?)', (name,))
+            name_id = ids[name] = self.connection.execute(
+                f'SELECT id FROM {table} WHERE name = ?', (name,)).fetchone()[0]
+        return name_id
+
+    def save_session(self, session_id, engine, ended_at):
+        """Insert the engine's events stored since the last save and its totals"""
+        first_kill, first_loot = unsaved_positions(engine, self.saved_positions.get(session_id, (0, 0)))
+        self.save_snapshot(session_id, take_snapshot(engine, ended_at, first_kill, first_loot))
+        self.saved_positions[session_id] = (len(engine.store.kill_times), len(engine.store.loot_times))
+
+    def save_snapshot(self, session_id, snapshot):
+        try:
+            with self.connection:
+                self.insert_events(session_id, snapshot)
+                self.replace_aggregates(session_id, snapshot)
+                self.connection.execute(
+                    'UPDATE sessions SET ended_at = ?, total_gold = ?, total_exp = ? WHERE id = ?',
+                    (format_timestamp(snapshot.ended_at), snapshot.total_gold, snapshot.total_exp, session_id))
+        except sqlite3.Error:
+            # Names inserted by the rolled back transaction are gone again
+            for ids in self.name_ids.values():
+                ids.clear()
+            raise
+
+    def monster_id(self, snapshot, index):
+        if index == NO_MONSTER:
+            return None
+        return self.name_id('monsters', snapshot.monster_names[index])
+
+    def item_id(self, snapshot, index):
+        return self.name_id('items', snapshot.item_names[index])
+
+    def insert_events(self, session_id, snapshot):
+        timestamps = {}
+
+        def timestamp(key):
+            text = timestamps.get(key)
+            if text is None:
+                text = timestamps[key] = format_timestamp(TIME_EPOCH + timedelta(seconds=key))
+            return text
+
+        kill_rows = ((session_id, timestamp(key), self.monster_id(snapshot, monster))
+                     for key, monster in zip(snapshot.kill_times, snapshot.kill_monsters))
+        for batch in batches(kill_rows):
+            self.connection.executemany(
+                'INSERT INTO kills (session_id, timestamp, monster_id) VALUES (?, ?, ?)', batch)
+
+        loot_rows = ((session_id, timestamp(key), self.monster_id(snapshot, monster),
+                      self.item_id(snapshot, item), quantity)
+                     for key, monster, item, quantity in zip(snapshot.loot_times, snapshot.loot_monsters,
+                                                             snapshot.loot_items, snapshot.loot_quantities))
+        for batch in batches(loot_rows):
+            self.connection.executemany(
+                'INSERT INTO loot (session_id, timestamp, monster_id, item_id, quantity) '
+                'VALUES (?, ?, ?, ?, ?)', batch)
+
+    def replace_aggregates(self, session_id, snapshot):
+        # Aggregates follow the current exclusions and prices, so they are replaced
+        self.connection.execute('DELETE FROM session_monsters WHERE session_id = ?', (session_id,))
+        self.connection.executemany(
+            'INSERT INTO session_monsters (session_id, monster_id, kills, exp) VALUES (?, ?, ?, ?)',
+            [(session_id, self.monster_id(snapshot, index), kills, exp) for index, kills, exp in snapshot.monsters])
+        self.connection.execute('DELETE FROM session_items WHERE session_id = ?', (session_id,))
+        self.connection.executemany(
+            'INSERT INTO session_items (session_id, item_id, quantity, gold) VALUES (?, ?, ?, ?)',
+            [(session_id, self.item_id(snapshot, index), quantity, gold) for index, quantity, gold in snapshot.items])
+
+    def hourly_rates(self, monster=None, since=None, until=None):
+        """Gold/hour and exp/hour over the sessions started in [since, until)
+
+        With a monster name, only sessions in which it was killed count.
+        """
+        query = ('SELECT SUM(total_gold), SUM(total_exp), '
+                 "SUM(strftime('%s', ended_at) - strftime('%s', started_at)) FROM sessions s WHERE 1")
+        parameters = []
+        if since is not None:
+            query += ' AND started_at >= ?'
+            parameters.append(format_timestamp(since))
+        if until is not None:
+            query += ' AND started_at < ?'
+            parameters.append(format_timestamp(until))
+        if monster is not None:
+            query += (' AND EXISTS (SELECT 1 FROM kills k JOIN monsters m ON m.id = k.monster_id '
+                      'WHERE k.session_id = s.id AND m.name = ?)')
+            parameters.append(monster.strip().lower())
+
+        total_gold, total_exp, seconds = self.connection.execute(query, parameters).fetchone()
+        if not seconds:
+            return 0, 0
+        return int(total_gold * 3600 / seconds), int(total_exp * 3600 / seconds)
+
+    def drop_rate(self, item, monster=None):
+        """Lifetime (drops, kills, drops per kill) of an item
+
+        Without a monster, drops are counted from every monster and divided
+        by all kills.
+        """
+        item = item.strip().lower()
+        if monster is None:
+            drops = self.connection.execute(
+                'SELECT COUNT(*) FROM loot l JOIN items i ON i.id = l.item_id '
+                'WHERE i.name = ? AND l.monster_id IS NOT NULL', (item,)).fetchone()[0]
+            kills = self.connection.execute('SELECT COUNT(*) FROM kills').fetchone()[0]
+        else:
+            monster = monster.strip().lower()
+            drops = self.connection.execute(
+                'SELECT COUNT(*) FROM loot l JOIN items i ON i.id = l.item_id '
+                'JOIN monsters m ON m.id = l.monster_id WHERE i.name = ? AND m.name = ?',
+                (item, monster)).fetchone()[0]
+            kills = self.connection.execute(
+                'SELECT COUNT(*) FROM kills k JOIN monsters m ON m.id = k.monster_id WHERE m.name = ?',
+                (monster,)).fetchone()[0]
+        return drops, kills, (drops / kills if kills else 0)
+
+
+class HistoryWriter:
+    """Saves sessions to a SessionHistory from a background thread
+
+    save() only takes a snapshot of the events stored since the previous
+    save and of the aggregates; the writer thread opens the database and
+    does every insert and commit, so the caller never waits on SQLite.
+    Session ids handed out here are the writer's own and are mapped to
+    the database ids on the writer thread. Rows of a save that failed are
+    taken again by the next save of that session.
+    """
+
+    def __init__(self, path, legacy_path=None):
+        self.path = path
+        # Moved to path when path does not exist yet, e.g. the history of an
+        # older version kept in the working directory
+        self.legacy_path = legacy_path
+        self.pending = []
+        self.condition = threading.Condition()
+        self.closed = False
+        self.session_ids = count(1)
+        self.positions = {}  # Format: {session: (kills, loot)} rows already snapshotted
+        self.thread = threading.Thread(target=self.run, name='history', daemon=True)
+        self.thread.start()
+
+    def put(self, command):
+        with self.condition:
+            self.pending.append(command)
+            self.condition.notify()
+
+    def start_session(self, started_at, log_path=None):
+        session = next(self.session_ids)
+        with self.condition:
+            self.positions[session] = (0, 0)
+        self.put(('start', session, started_at, log_path))
+        return session
+
+    def save(self, session, engine, ended_at):
+        with self.condition:
+            first_kill, first_loot = unsaved_positions(engine, self.positions.get(session, (0, 0)))
+            self.positions[session] = (len(engine.store.kill_times), len(engine.store.loot_times))
+        self.put(('save', session, take_snapshot(engine, ended_at, first_kill, first_loot), (first_kill, first_loot)))
+
+    def move_legacy(self):
+        if self.legacy_path is None or os.path.exists(self.path) or not os.path.exists(self.legacy_path):
+            return
+        # The write-ahead log holds commits not yet copied into the database
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(self.legacy_path + suffix):
+                shutil.move(self.legacy_path + suffix, self.path + suffix)
+
+    def run(self):
+        try:
+            self.move_legacy()
+        except OSError as e:
+            print(f"Error moving history {self.legacy_path}: {e}")
+        try:
+            history = SessionHistory(self.path)
+        except sqlite3.Error as e:
+            print(f"Error opening history {self.path}: {e}")
+            history = None
+        session_ids = {}
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    break
+                commands, self.pending = self.pending, []
+            if history is not None:
+                for command in commands:
+                    self.execute(history, session_ids, command)
+        if history is not None:
+            history.close()
+
+    def execute(self, history, session_ids, command):
+        kind, session = command[:2]
+        try:
+            if kind == 'start':
+                session_ids[session] = history.start_session(*command[2:])
+            elif session in session_ids:
+                history.save_snapshot(session_ids[session], command[2])
+        except sqlite3.Error as e:
+            print(f"Error saving session history: {e}")
+            if kind == 'save':
+                with self.condition:
+                    self.positions[session] = tuple(map(min, self.positions[session], command[3]))
+
+    def close(self):
+        """Write every pending save and stop the writer thread"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
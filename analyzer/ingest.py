@@ -0,0 +1,117 @@
+import queue
+import threading
+import time
+
+from analyzer.engine import LogParser, LootEngine
+
+
+class IngestWorker(threading.Thread):
+    """Reads and parses the log off the Tk thread
+
+    Every batch of new lines is aggregated into a small LootEngine delta
+    and put on a bounded queue, so a slow consumer throttles the reader.
+    Deltas are tagged with the generation of the last restart so the
+    consumer can drop batches parsed for a previous session.
+
+    With a LogIndex a restart seeks to the first line of the new session
+    instead of re-reading the log from the beginning. With Timings the
+    read and parse of every batch are recorded as 'read' and 'parse'.
+    """
+
+    def __init__(self, follower, engine, max_batches=8, batch_bytes=256 * 1024, index=None, timings=None):
+        super().__init__(name='ingest', daemon=True)
+        self.follower = follower
+        # Exclusions are read from the consumer's engine; they are frozensets
+        # that are replaced, never mutated, so reading them here is safe
+        self.engine = engine
+        self.parser = LogParser(engine.start_time, engine.catalog.normalizer)
+        self.batch_bytes = batch_bytes
+        self.deltas = queue.Queue(maxsize=max_batches)
+        self.commands = queue.Queue()
+        self.generation = 0
+        self.stopped = threading.Event()
+        self.index = index
+        self.timings = timings
+        # Totals for the diagnostics, only ever incremented by this thread
+        self.lines_read = 0
+        self.bytes_read = 0
+        # The initial session is located through the index as well
+        self.restart(self.generation, engine.start_time)
+
+    def restart(self, generation, start_time):
+        # Re-read the log from the start of the new session
+        self.commands.put((generation, start_time))
+
+    def stop(self):
+        self.stopped.set()
+
+    def run(self):
+        while not self.stopped.is_set():
+            self.handle_commands()
+
+            started = time.perf_counter()
+            try:
+                data = self.follower.read(self.batch_bytes)
+            except OSError as e:
+                print(f"Error reading file: {e}")
+                data = b''
+
+            if data:
+                parse_started = time.perf_counter()
+                delta = self.parse(data, self.follower.line_position - len(data))
+                if self.timings is not None:
+                    self.timings.record('read', parse_started - started)
+                    self.timings.record('parse', time.perf_counter() - parse_started)
+                self.lines_read += data.count(b'\n')
+                self.bytes_read += len(data)
+                self.publish(delta)
+            elif self.follower.pending() == 0 and self.commands.empty():
+                self.follower.wait(0.5)
+
+        self.update_index()
+        self.follower.close()
+
+    def handle_commands(self):
+        while True:
+            try:
+                generation, start_time = self.commands.get_nowait()
+            except queue.Empty:
+                return
+            self.generation = generation
+            position, section_datetime = self.seek_position(start_time)
+            self.parser.reset(start_time, section_datetime)
+            self.follower.rewind(position)
+
+    def update_index(self):
+        if self.index is None:
+            return False
+        try:
+            self.index.update()
+        except OSError as e:
+            print(f"Error indexing file: {e}")
+            return False
+        self.index.save()
+        return True
+
+    def seek_position(self, start_time):
+        if not self.update_index():
+            return 0, None
+        return self.index.seek_position(start_time)
+
+    def parse(self, data, offset=None):
+        delta = LootEngine(excluded_items=self.engine.excluded_items,
+                           excluded_monsters=self.engine.excluded_monsters,
+                           catalog=self.engine.catalog)
+        delta.apply(self.parser.feed(data, offset))
+        return delta
+
+    def publish(self, delta):
+        item = (self.generation, delta)
+        while not self.stopped.is_set():
+            try:
+                self.deltas.put(item, timeout=0.5)
+                return
+            except queue.Full:
+                # A restart makes the blocked batch obsolete
+                if not self.commands.empty():
+                    return
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import re
+from bisect import bisect_right
+from datetime import datetime
+
+from analyzer.engine import SECTION_DATE_FORMAT, line_datetime
+
+INDEX_VERSION = 1
+# Only the line prefix matters for the index, the rest of the line is skipped
+INDEX_PATTERN = re.compile(rb'^(?:Channel saved at ([^\r\n]+)|(\d{2}):(\d{2}))', re.MULTILINE)
+# The first bytes of the log identify it, a rotated log has a different head
+HEAD_SIZE = 4096
+CHUNK_SIZE = 1024 * 1024
+MINUTE_EPOCH = datetime(2000, 1, 1)
+
+
+def minute_key(timestamp):
+    return int((timestamp - MINUTE_EPOCH).total_seconds() // 60)
+
+
+class LogIndex:
+    """Sidecar index from log times to byte offsets in Loot.txt
+
+    Records the offset of every "Channel saved at" header with its date and
+    the first offset of every run of lines sharing a minute, so a session
+    start becomes a seek instead of a re-read from byte 0. The index only
+    covers complete lines and is extended from where it stopped.
+    """
+
+    def __init__(self, log_path, index_path=None):
+        self.log_path = log_path
+        self.index_path = index_path or log_path + '.idx'
+        self.clear()
+        self.load()
+
+    def clear(self):
+        self.head = None
+        self.indexed_to = 0
+        self.section_offsets = []
+        self.section_datetimes = []
+        self.minutes = []  # (minute key, offset) each time the minute changes
+        self.dirty = True
+
+    def load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('version') != INDEX_VERSION:
+            return
+        try:
+            self.head = data['head']
+            self.indexed_to = data['indexed_to']
+            self.section_offsets = [offset for offset, _ in data['sections']]
+            self.section_datetimes = [datetime.fromisoformat(value) for _, value in data['sections']]
+            self.minutes = [tuple(entry) for entry in data['minutes']]
+        except (KeyError, TypeError, ValueError):
+            self.clear()
+            return
+        self.dirty = False
+
+    def save(self):
+        if not self.dirty:
+            return
+        data = {
+            'version': INDEX_VERSION,
+            'head': self.head,
+            'indexed_to': self.indexed_to,
+            'sections': [[offset, value.isoformat()]
+                         for offset, value in zip(self.section_offsets, self.section_datetimes)],
+            'minutes': self.minutes,
+        }
+        temp_path = self.index_path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(temp_path, self.index_path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Error saving log index: {e}")
+
+    def read_head(self):
+        with open(self.log_path, 'rb') as f:
+            return hashlib.sha1(f.read(HEAD_SIZE)).hexdigest()
+
+    def update(self):
+        """Index the lines appended since the last update"""
+        try:
+            size = os.path.getsize(self.log_path)
+            head = self.read_head()
+        except OSError:
+            return
+
+        # A truncated or replaced log invalidates everything indexed so far;
+        # while the log is shorter than HEAD_SIZE its head still changes
+        if size < self.indexed_to or (head != self.head and self.indexed_to >= HEAD_SIZE):
+            self.clear()
+        if head != self.head:
+            self.head = head
+            self.dirty = True
+        if size == self.indexed_to:
+            return
+
+        with open(self.log_path, 'rb') as f:
+            f.seek(self.indexed_to)
+            pending = b''
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                data = pending + chunk
+                end = data.rfind(b'\n') + 1
+                self.index_lines(data[:end], self.indexed_to)
+                self.indexed_to += end
+                pending = data[end:]
+        self.dirty = True
+
+    def index_lines(self, data, base_offset):
+        section = self.section_datetimes[-1] if self.section_datetimes else None
+        last_key = self.minutes[-1][0] if self.minutes else None
+        for match in INDEX_PATTERN.finditer(data):
+            offset = base_offset + match.start()
+            saved, hour, minute = match.groups()
+            if saved is not None:
+                try:
+                    section = datetime.strptime(saved.decode('utf-8', errors='replace').strip(),
+                                                SECTION_DATE_FORMAT)
+                except ValueError:
+                    continue
+                self.section_offsets.append(offset)
+                self.section_datetimes.append(section)
+                last_key = None
+                continue
+            if section is None:
+                continue
+            try:
+                key = minute_key(line_datetime(section, int(hour), int(minute)))
+            except ValueError:
+                continue
+            if key != last_key:
+                self.minutes.append((key, offset))
+                last_key = key
+
+    def seek_position(self, start_time):
+        """Offset to resume parsing at for start_time, and the section date there
+
+        Every line at or after start_time lies at or after the offset. Lines
+        are not assumed to be in time order, so the earliest matching minute
+        run wins. Bytes past the indexed range are always re-read.
+        """
+        if start_time is None:
+            return 0, None
+
+        start_key = minute_key(start_time)
+        offset = self.indexed_to
+        for key, minute_offset in self.minutes:
+            if key >= start_key and minute_offset < offset:
+                offset = minute_offset
+
+        position = bisect_right(self.section_offsets, offset) - 1
+        if position < 0:
+            return 0, None
+        return offset, self.section_datetimes[position]
@@ -0,0 +1,118 @@
+import re
+from functools import lru_cache
+
+QUANTITY_PATTERN = re.compile(r'(\d+)\s+(.+?)(?:\.)?$')
+ARTICLE_PATTERN = re.compile(r'^(a|an)\s+')
+# Names that should keep their 's'
+KEEP_S = ('boots', 'legs')
+# Loot entries that are not items
+SKIPPED_ITEMS = ('bag', 'empty')
+# Plurals the suffix rules get wrong, for names missing from db.json
+IRREGULAR_PLURALS = {'knives': 'knife'}
+
+
+def normalize_plural(word):
+    # Remove articles and trim
+    word = ARTICLE_PATTERN.sub('', word.strip())
+
+    last_space = word.rfind(' ') + 1
+    irregular = IRREGULAR_PLURALS.get(word[last_space:].lower())
+    if irregular is not None:
+        return word[:last_space] + irregular
+
+    # Special cases that should keep their 's'
+    if word.lower().endswith(KEEP_S):
+        return word
+
+    # Handle special plural cases
+    if word.endswith('ies'):
+        return word[:-3] + 'y'
+    elif word.endswith('ves'):
+        return word[:-3] + 'f'
+    elif word.endswith('s'):
+        return word[:-1]
+
+    return word
+
+
+def plural_forms(word):
+    forms = [word + 's', word + 'es']
+    if word.endswith('y'):
+        forms.append(word[:-1] + 'ies')
+    elif word.endswith('fe'):
+        forms.append(word[:-2] + 'ves')
+    elif word.endswith('f'):
+        forms.append(word[:-1] + 'ves')
+    return forms
+
+
+def name_forms(name):
+    # Plurals of the last word ("dragon hams"), or of the word before "of"
+    # ("hallowed pieces of cloth")
+    head, _, last = name.rpartition(' ')
+    forms = [f"{head} {form}" if head else form for form in plural_forms(last)]
+    if ' of ' in name:
+        head, _, rest = name.partition(' of ')
+        head, _, word = head.rpartition(' ')
+        forms.extend(f"{head} {form} of {rest}" if head else f"{form} of {rest}" for form in plural_forms(word))
+    return forms
+
+
+class ItemNormalizer:
+    """Resolves loot list entries to item names and quantities
+
+    Quantities and articles are split off first, then the name is looked up
+    in a map of the known item names and their plurals, built once from
+    item_db; the plural rules of normalize_plural are only the fallback
+    for names missing from the map.
+    Results are memoized in a bounded LRU cache keyed by the raw entry.
+    """
+
+    def __init__(self, item_names=(), cache_size=8192):
+        self.names = {}
+        for name in item_names:
+            self.names[name] = name
+        for name in item_names:
+            for form in name_forms(name):
+                self.names.setdefault(form, name)
+        self.rule_fallbacks = 0
+        self.resolve = lru_cache(maxsize=cache_size)(self.parse_entry)
+
+    def parse_entry(self, entry):
+        """(item name, quantity) of a lowercase loot entry, None for bags and empty"""
+        item = entry.strip().rstrip('.')
+
+        # Handle items with explicit quantities
+        quantity_match = item[:1].isdigit() and QUANTITY_PATTERN.match(item)
+        if quantity_match:
+            quantity = int(quantity_match.group(1))
+            item_name = quantity_match.group(2)
+        # Handle items with "a" or "an"
+        elif item.startswith(('a ', 'an ')):
+            quantity = 1
+            item_name = item[item.index(' ')+1:]
+        else:
+            quantity = 1
+            item_name = item
+
+        name = self.names.get(item_name)
+        if name is None:
+            self.rule_fallbacks += 1
+            name = normalize_plural(item_name)
+
+        if name in SKIPPED_ITEMS:
+            return None
+        return name, quantity
+
+    @property
+    def hit_rate(self):
+        """Share of entries answered from the cache"""
+        info = self.resolve.cache_info()
+        lookups = info.hits + info.misses
+        return info.hits / lookups if lookups else 0.0
+
+    @property
+    def dictionary_rate(self):
+        """Share of distinct entries whose name was found in item_db"""
+        misses = self.resolve.cache_info().misses
+        return 1 - self.rule_fallbacks / misses if misses else 0.0
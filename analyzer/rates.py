@@ -0,0 +1,79 @@
+from array import array
+
+# Rolling windows offered next to the session average, in minutes
+RATE_WINDOWS = (5, 15, 60)
+
+
+def window_label(minutes):
+    if minutes % 60 == 0:
+        hours = minutes // 60
+        return f"{hours} hour" if hours == 1 else f"{hours} hours"
+    return f"{minutes} min"
+
+
+class RollingRates:
+    """Gold and exp per minute of log time, summed over sliding windows
+
+    Minutes are whole minutes since TIME_EPOCH. The buckets form a ring as
+    long as the longest window, and every window keeps a running sum of
+    the buckets it covers, so adding an event or moving to a new minute
+    costs a few additions per window whatever the number of events.
+    """
+
+    def __init__(self, windows=RATE_WINDOWS):
+        self.windows = tuple(windows)
+        self.size = max(self.windows)
+        self.clear()
+
+    def clear(self):
+        self.gold = array('q', bytes(8 * self.size))
+        self.exp = array('q', bytes(8 * self.size))
+        self.gold_sums = dict.fromkeys(self.windows, 0)
+        self.exp_sums = dict.fromkeys(self.windows, 0)
+        self.minute = None  # latest minute of the buckets
+
+    def advance(self, minute):
+        """Move the windows forward to end at minute"""
+        if self.minute is None or minute - self.minute >= self.size:
+            # Every bucket is out of every window
+            self.clear()
+            self.minute = minute
+            return
+        gold, exp, size = self.gold, self.exp, self.size
+        for latest in range(self.minute + 1, minute + 1):
+            # The bucket leaving each window, then the oldest slot is reused
+            for window in self.windows:
+                slot = (latest - window) % size
+                self.gold_sums[window] -= gold[slot]
+                self.exp_sums[window] -= exp[slot]
+            slot = latest % size
+            gold[slot] = 0
+            exp[slot] = 0
+        self.minute = max(self.minute, minute)
+
+    def add(self, minute, gold=0, exp=0):
+        if self.minute is None or minute > self.minute:
+            self.advance(minute)
+        age = self.minute - minute
+        if age >= self.size:
+            return
+        slot = minute % self.size
+        self.gold[slot] += gold
+        self.exp[slot] += exp
+        for window in self.windows:
+            if age < window:
+                self.gold_sums[window] += gold
+                self.exp_sums[window] += exp
+
+    def per_hour(self, window, elapsed_seconds=None):
+        """(gold/hour, exp/hour) over the last window minutes
+
+        With elapsed_seconds, a session shorter than the window is averaged
+        over its own length instead.
+        """
+        seconds = window * 60
+        if elapsed_seconds is not None:
+            seconds = min(seconds, elapsed_seconds)
+        if seconds <= 0:
+            return 0, 0
+        return int(self.gold_sums[window] * 3600 / seconds), int(self.exp_sums[window] * 3600 / seconds)
@@ -0,0 +1,136 @@
+from analyzer.rates import window_label
+from analyzer.totals import per_hour
+
+# Event points are looted without a monster and have no drop rate
+EVENT_POINT_TYPES = {'halloween point', 'christmas voucher', 'anniversary token', 'demonic ticket'}
+
+
+def format_duration(seconds):
+    seconds = max(int(seconds), 0)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def drop_rate(engine, item_name):
+    # Corpses that dropped the item over all kills of the monsters that drop it
+    if item_name not in engine.item_sources:
+        return "0%"
+
+    total_drops = 0
+    total_kills = 0
+    for monster in engine.item_sources[item_name]:
+        if monster in engine.monster_kills:
+            total_kills += engine.monster_kills[monster]
+            drops = engine.monster_drops.get(monster, {}).get(item_name)
+            if drops:
+                total_drops += drops.count
+
+    if total_kills == 0:
+        return "0%"
+    return f"{(total_drops / total_kills) * 100:.2f}%"
+
+
+def drop_details(drops, kills):
+    return f"{(drops.count / kills) * 100:.2f}%, avg: {drops.mean:.1f}, range: {drops.quantity_range()}"
+
+
+def write_report(file, engine, elapsed_seconds):
+    """Write the session summary with drop tables, as exported by the window"""
+    catalog = engine.catalog
+
+    # Session Summary
+    file.write(f"Session Time: {format_duration(elapsed_seconds)}\n")
+    file.write(f"Total Gold: {engine.total_gold:,}\n")
+    file.write(f"Total Exp: {engine.total_exp:,}\n")
+    file.write(f"Gold/Hour: {per_hour(engine.total_gold, elapsed_seconds):,}\n")
+    file.write(f"Exp/Hour: {per_hour(engine.total_exp, elapsed_seconds):,}\n")
+    for window in engine.rates.windows:
+        gold_per_hour, exp_per_hour = engine.rates.per_hour(window, elapsed_seconds)
+        file.write(f"Last {window_label(window)}: {gold_per_hour:,} gold/hour, {exp_per_hour:,} exp/hour\n")
+    file.write("\n")
+
+    # Loot Items with Drop Rates
+    file.write("Loot Items:\n")
+    file.write("-" * 100 + "\n")
+    file.write(f"{'Item':<30} {'Count':<10} {'Price':<12} {'Total':<15} {'Drop Rate':<10} {'Sources'}\n")
+    file.write("-" * 100 + "\n")
+
+    for item, count in sorted(engine.loot_counts.items()):
+        if item in EVENT_POINT_TYPES:
+            continue
+
+        price = catalog.get_item_price(item)
+        total = price * count
+
+        # Get drop sources and rates with ranges and averages
+        sources_info = []
+        for monster in engine.item_sources.get(item, ()):
+            kills = engine.monster_kills.get(monster, 0)
+            drops = engine.monster_drops[monster].get(item)
+            if kills > 0 and drops:
+                sources_info.append(f"{monster} ({drop_details(drops, kills)})")
+
+        sources_text = " | ".join(sources_info) if sources_info else "N/A"
+        file.write(f"{item:<30} {count:<10} {price:<12,} {total:<15,} {drop_rate(engine, item):<10} {sources_text}\n")
+
+    # Monster Kills with Drop Details
+    file.write("\nMonster Kills and Drops:\n")
+    file.write("-" * 100 + "\n")
+    file.write(f"{'Monster':<25} {'Kills':<8} {'Exp/Kill':<10} {'Total Exp':<15} {'Items Dropped'}\n")
+    file.write("-" * 100 + "\n")
+
+    for monster, kills in sorted(engine.monster_kills.items()):
+        exp = catalog.get_monster_exp(monster)
+        dropped_items = [f"{item} ({drop_details(drops, kills)})"
+                         for item, drops in engine.monster_drops.get(monster, {}).items()]
+        items_text = " | ".join(dropped_items) if dropped_items else "None"
+        file.write(f"{monster:<25} {kills:<8} {exp:<10,} {exp * kills:<15,} {items_text}\n")
+
+    # Excluded Items and Monsters
+    file.write("\nExcluded Items:\n")
+    for item in sorted(engine.excluded_items):
+        file.write(f"{item}\n")
+
+    file.write("\nExcluded Monsters:\n")
+    for monster in sorted(engine.excluded_monsters):
+        file.write(f"{monster}\n")
+
+    file.write("\nCustom Item Prices:\n")
+    for item, price in catalog.custom_item_prices.items():
+        file.write(f"{item}: {price:,} gold\n")
+
+
+def report_data(engine, elapsed_seconds):
+    """The session summary as JSON-serializable data"""
+    catalog = engine.catalog
+    items = []
+    for item, count in sorted(engine.loot_counts.items()):
+        price = catalog.get_item_price(item)
+        items.append({'item': item, 'count': count, 'price': price, 'total': price * count,
+                      'drop_rate': drop_rate(engine, item)})
+
+    monsters = []
+    for monster, kills in sorted(engine.monster_kills.items()):
+        exp = catalog.get_monster_exp(monster)
+        drops = {item: {'drops': stats.count, 'drop_rate': stats.count / kills, 'mean': stats.mean,
+                        'min': stats.min, 'max': stats.max}
+                 for item, stats in engine.monster_drops.get(monster, {}).items()}
+        monsters.append({'monster': monster, 'kills': kills, 'exp': exp, 'total_exp': exp * kills,
+                         'drops': drops})
+
+    return {
+        'session_seconds': int(elapsed_seconds),
+        'total_gold': engine.total_gold,
+        'total_exp': engine.total_exp,
+        'gold_per_hour': per_hour(engine.total_gold, elapsed_seconds),
+        'exp_per_hour': per_hour(engine.total_exp, elapsed_seconds),
+        'rolling_rates': [dict(zip(('minutes', 'gold_per_hour', 'exp_per_hour'),
+                                   (window,) + engine.rates.per_hour(window, elapsed_seconds)))
+                          for window in engine.rates.windows],
+        'items': items,
+        'monsters': monsters,
+        'excluded_items': sorted(engine.excluded_items),
+        'excluded_monsters': sorted(engine.excluded_monsters),
+        'custom_prices': catalog.custom_item_prices,
+    }
@@ -0,0 +1,57 @@
+import mmap
+import os
+import re
+
+# Every line that can produce an event contains one of these
+CANDIDATE_PATTERN = re.compile(
+    rb'Channel saved at'
+    rb'|Loot of '
+    rb'|Content of a bag within the corpse of '
+    rb'|Looted \d'
+)
+# Scanned pages are handed back to the OS in windows of this size
+RELEASE_SIZE = 8 * 1024 * 1024
+MADV_DONTNEED = getattr(mmap, 'MADV_DONTNEED', None)
+
+
+def scan_events(path, parser, start=0, end=None, batch_size=10000):
+    """Yield lists of events parsed from path[start:end] through a memory map
+
+    The mapped file is searched for candidate lines without copying it;
+    only the candidate lines are sliced out, decoded and parsed. Lines
+    without a candidate never produce an event, so the result is the same
+    as parser.feed() of the whole range. Scanned pages are released as the
+    scan moves on, so memory use does not grow with the file size.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        end = size if end is None else min(end, size)
+        if end <= start:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            search = CANDIDATE_PATTERN.search
+            parse_line = parser.parse_line
+            released = start - start % mmap.PAGESIZE
+            position = start
+            events = []
+            while True:
+                match = search(buffer, position, end)
+                if match is None:
+                    break
+                line_start = max(buffer.rfind(b'\n', start, match.start()) + 1, start)
+                line_end = buffer.find(b'\n', match.end(), end)
+                if line_end < 0:
+                    line_end = end
+                line = buffer[line_start:line_end].decode('utf-8', errors='replace').rstrip('\r')
+                events.extend(parse_line(line, line_start))
+                position = line_end + 1
+
+                if len(events) >= batch_size:
+                    yield events
+                    events = []
+                if MADV_DONTNEED is not None and position - released >= RELEASE_SIZE:
+                    release_end = position - position % mmap.PAGESIZE
+                    buffer.madvise(MADV_DONTNEED, released, release_end - released)
+                    released = release_end
+            if events:
+                yield events
@@ -0,0 +1,95 @@
+from array import array
+
+
+def extremes(low, high):
+    # The min and max sample of a bucket in time order, once if they are the same
+    if low is high:
+        return (low,)
+    return (low, high) if low[0] < high[0] else (high, low)
+
+
+class TimeSeries:
+    """Fixed-capacity ring buffer of (time, value) samples
+
+    Times are seconds (e.g. datetime.timestamp()) and must be appended in
+    order. Once full, every append overwrites the oldest sample, so memory
+    and append cost stay constant however long the session runs.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.times = array('d', bytes(8 * capacity))
+        self.values = array('d', bytes(8 * capacity))
+        self.start = 0  # slot of the oldest sample
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def clear(self):
+        self.start = 0
+        self.size = 0
+
+    def append(self, time, value):
+        if self.size < self.capacity:
+            slot = (self.start + self.size) % self.capacity
+            self.size += 1
+        else:
+            slot = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.times[slot] = time
+        self.values[slot] = value
+
+    def slot(self, index):
+        return (self.start + index) % self.capacity
+
+    def first_after(self, time):
+        # Binary search for the first sample newer than time
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.times[self.slot(mid)] > time:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
+
+    def samples(self, since=None):
+        """(time, value) pairs in order, only those newer than since if given"""
+        first = 0 if since is None else self.first_after(since)
+        times, values = self.times, self.values
+        for index in range(first, self.size):
+            slot = self.slot(index)
+            yield times[slot], values[slot]
+
+    def downsample(self, buckets, since=None):
+        """At most two samples per bucket of the time range: its min and max
+
+        The range from the first to the last sample newer than since is cut
+        into equal buckets (one per pixel column) and each keeps its lowest
+        and highest sample in time order, so peaks and dips survive any
+        reduction. Returns a list of (time, value) pairs.
+        """
+        samples = list(self.samples(since))
+        if len(samples) <= 2 * buckets:
+            return samples
+        first_time = samples[0][0]
+        span = samples[-1][0] - first_time
+        if span <= 0:
+            return [min(samples, key=lambda sample: sample[1]), max(samples, key=lambda sample: sample[1])]
+        reduced = []
+        bucket = None
+        low = high = None
+        for sample in samples:
+            index = min(int((sample[0] - first_time) * buckets / span), buckets - 1)
+            if index != bucket:
+                if bucket is not None:
+                    reduced.extend(extremes(low, high))
+                bucket = index
+                low = high = sample
+            elif sample[1] < low[1]:
+                low = sample
+            elif sample[1] > high[1]:
+                high = sample
+        reduced.extend(extremes(low, high))
+        return reduced
@@ -0,0 +1,99 @@
+import json
+import os
+import sys
+import threading
+
+APP_NAME = 'MediviaAnalyzer'
+SETTINGS_FILE = 'analyzer_settings.json'
+
+
+def config_dir(app_name=APP_NAME):
+    """Per-user configuration directory, created on first use"""
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_CONFIG_HOME') or os.path.expanduser('~/.config')
+    path = os.path.join(base, app_name)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError as e:
+        # Writes to it then fail and are reported where they happen
+        print(f"Could not create {path}: {e}")
+    return path
+
+
+def write_json(path, data):
+    # Readers see the old file or the new one, never a partial write
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+class SettingsStore:
+    """Settings file written from a background thread
+
+    save() only hands over a snapshot of the settings; the writer thread
+    writes the latest snapshot atomically, then waits `interval` seconds
+    before the next write, so bursts of edits (or a window being resized)
+    coalesce into at most one write per interval. Snapshots must not be
+    modified after they are passed to save().
+    """
+
+    def __init__(self, path, interval=2.0, legacy_path=None):
+        self.path = path
+        self.interval = interval
+        # Read when the file does not exist yet, e.g. settings of an older
+        # version kept in the working directory
+        self.legacy_path = legacy_path
+        self.pending = None
+        self.condition = threading.Condition()
+        self.closed = False
+        self.thread = threading.Thread(target=self.run, name='settings', daemon=True)
+        self.thread.start()
+
+    def load(self):
+        for path in (self.path, self.legacy_path):
+            if path is None:
+                continue
+            try:
+                with open(path, 'r') as f:
+                    return json.load(f)
+            except FileNotFoundError:
+                continue
+            except (OSError, ValueError) as e:
+                print(f"Error loading settings from {path}: {e}")
+        return {}
+
+    def save(self, settings):
+        with self.condition:
+            self.pending = settings
+            self.condition.notify()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                settings, self.pending = self.pending, None
+            self.write(settings)
+            # Later saves wait here and only the last one is written
+            with self.condition:
+                self.condition.wait_for(lambda: self.closed, self.interval)
+
+    def write(self, settings):
+        try:
+            write_json(self.path, settings)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Error saving settings: {e}")
+
+    def close(self):
+        """Write any pending settings and stop the writer thread"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
@@ -0,0 +1,111 @@
+from array import array
+from collections import Counter
+from datetime import datetime
+from itertools import compress
+
+TIME_EPOCH = datetime(2000, 1, 1)
+# Event points have no monster
+NO_MONSTER = -1
+# Lines fed without a file offset
+NO_OFFSET = -1
+
+
+def time_key(timestamp):
+    delta = timestamp - TIME_EPOCH
+    return delta.days * 86400 + delta.seconds
+
+
+def window_key(timestamp):
+    # Window bounds round up, so whole-second event times compare as the datetimes do
+    delta = timestamp - TIME_EPOCH
+    return delta.days * 86400 + delta.seconds + (1 if delta.microseconds else 0)
+
+
+class EventStore:
+    """Columnar record of every parsed kill and loot event of a session
+
+    Events are kept regardless of exclusions, as parallel arrays of
+    seconds since TIME_EPOCH, catalog ids, quantities and source line
+    offsets, so a changed exclusion or time window is answered by
+    counting the columns again instead of parsing the log again.
+    """
+
+    def __init__(self):
+        self.last_timestamp = None
+        self.last_time_key = None
+        self.clear()
+
+    def clear(self):
+        self.kill_times = array('q')
+        self.kill_monsters = array('l')
+        self.kill_offsets = array('q')
+        self.loot_times = array('q')
+        self.loot_monsters = array('l')
+        self.loot_items = array('l')
+        self.loot_quantities = array('q')
+        self.loot_offsets = array('q')
+
+    def __len__(self):
+        return len(self.kill_times) + len(self.loot_times)
+
+    def time_key(self, timestamp):
+        # Events of a line, and usually of a minute, share one timestamp
+        if timestamp is not self.last_timestamp:
+            self.last_timestamp = timestamp
+            self.last_time_key = time_key(timestamp)
+        return self.last_time_key
+
+    def extend(self, other):
+        self.kill_times.extend(other.kill_times)
+        self.kill_monsters.extend(other.kill_monsters)
+        self.kill_offsets.extend(other.kill_offsets)
+        self.loot_times.extend(other.loot_times)
+        self.loot_monsters.extend(other.loot_monsters)
+        self.loot_items.extend(other.loot_items)
+        self.loot_quantities.extend(other.loot_quantities)
+        self.loot_offsets.extend(other.loot_offsets)
+
+    def kill_counts(self, start_time=None, end_time=None, first=0):
+        """Kills per monster id within [start_time, end_time)"""
+        times, monsters = self.kill_times, self.kill_monsters
+        if first:
+            times, monsters = times[first:], monsters[first:]
+        mask = self.window_mask(times, start_time, end_time)
+        return Counter(monsters if mask is None else compress(monsters, mask))
+
+    def loot_counts(self, start_time=None, end_time=None, first=0):
+        """Drops per (monster id, item id, quantity) within [start_time, end_time)
+
+        Keys keep the order they were first seen in, like the drops did.
+        """
+        times, monsters, items, quantities = \
+            self.loot_times, self.loot_monsters, self.loot_items, self.loot_quantities
+        if first:
+            times, monsters, items, quantities = \
+                times[first:], monsters[first:], items[first:], quantities[first:]
+        drops = zip(monsters, items, quantities)
+        mask = self.window_mask(times, start_time, end_time)
+        return Counter(drops if mask is None else compress(drops, mask))
+
+    def kill_minutes(self, start_time=None, end_time=None, first=0):
+        """Kills per (minute, monster id) within [start_time, end_time)"""
+        times, monsters = self.kill_times[first:], self.kill_monsters[first:]
+        kills = zip(map((60).__rfloordiv__, times), monsters)
+        mask = self.window_mask(times, start_time, end_time)
+        return Counter(kills if mask is None else compress(kills, mask))
+
+    def loot_minutes(self, start_time=None, end_time=None, first=0):
+        """Drops per (minute, item id, quantity) within [start_time, end_time)"""
+        times, items, quantities = self.loot_times[first:], self.loot_items[first:], self.loot_quantities[first:]
+        drops = zip(map((60).__rfloordiv__, times), items, quantities)
+        mask = self.window_mask(times, start_time, end_time)
+        return Counter(drops if mask is None else compress(drops, mask))
+
+    @staticmethod
+    def window_mask(times, start_time, end_time):
+        if start_time is None and end_time is None:
+            return None
+        if end_time is None:
+            return map(window_key(start_time).__le__, times)
+        start = -2 ** 63 if start_time is None else window_key(start_time)
+        return map(range(start, window_key(end_time)).__contains__, times)
@@ -0,0 +1,203 @@
+from bisect import bisect_left, insort
+
+# Above this share of moved rows a refresh re-sorts instead of moving rows one by one
+RESORT_FRACTION = 1 / 32
+
+
+class TreeTable:
+    """Keyed, virtualized view model for a Treeview
+
+    Rows are identified by a key (item or monster name) and given as a tuple
+    of raw values, one per column. The model keeps every row and the keys
+    in display order; the tree only holds the rows that fit on screen.
+    Those tree rows are reused as the view scrolls or the model changes,
+    and a row is only written to again when the values it shows changed.
+
+    The table scrolls the model instead of the tree, so a scrollbar must be
+    attached with attach_scrollbar() rather than to tree.yview.
+
+    Sorting happens on the raw values. The order is kept ascending by a
+    cached (value, key) per row and shown back to front when reversed, so
+    flipping the direction is free and a refresh only moves the rows whose
+    sort value changed.
+    """
+
+    # Used until the tree has drawn a row that can be measured
+    DEFAULT_ROW_HEIGHT = 20
+    DEFAULT_HEADING_HEIGHT = 25
+    WHEEL_ROWS = 3
+
+    def __init__(self, tree, columns, format_row):
+        self.tree = tree
+        self.columns = columns
+        self.format_row = format_row
+        self.rows = {}       # key -> raw values
+        self.order = []      # keys ascending by sort key
+        self.sort_keys = {}  # key -> (value of the sort column, key)
+        self.sort_column = 0
+        self.reverse = False
+
+        # The visible window into order and the tree rows that show it
+        self.first = 0
+        self.visible = int(tree.cget('height'))
+        self.slots = []      # tree iids, top to bottom
+        self.shown = []      # (key, formatted values) of every slot
+        self.keys = {}       # tree iid -> key
+        self.row_height = self.DEFAULT_ROW_HEIGHT
+        self.heading_height = self.DEFAULT_HEADING_HEIGHT
+        self.scrollbar = None
+
+        # Selection is kept by key, so it follows a row that moves
+        self.selected_keys = set()
+        self.applied_selection = ()
+
+        tree.configure(yscrollcommand='')
+        tree.bind('<Configure>', self.on_resize, add='+')
+        tree.bind('<<TreeviewSelect>>', self.on_select, add='+')
+        for sequence in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            tree.bind(sequence, self.on_wheel, add='+')
+
+    def __len__(self):
+        return len(self.order)
+
+    def attach_scrollbar(self, scrollbar):
+        self.scrollbar = scrollbar
+        scrollbar.configure(command=self.yview)
+        self.update_scrollbar()
+
+    def update(self, rows):
+        # Drop rows that are gone from the model
+        removed = [key for key in self.rows if key not in rows]
+        if removed:
+            for key in removed:
+                del self.rows[key]
+                del self.sort_keys[key]
+            removed = set(removed)
+            self.order = [key for key in self.order if key not in removed]
+            self.selected_keys -= removed
+
+        column = self.sort_column
+        moved = []
+        added = []
+        for key, values in rows.items():
+            old_values = self.rows.get(key)
+            self.rows[key] = values
+            if old_values is None:
+                added.append(key)
+            elif old_values[column] != values[column]:
+                moved.append(key)
+
+        if len(moved) + len(added) > len(self.order) * RESORT_FRACTION:
+            # Many changes: refresh the keys and let the sort merge the runs
+            for key in moved + added:
+                self.sort_keys[key] = (rows[key][column], key)
+            self.order.extend(added)
+            self.order.sort(key=self.sort_keys.__getitem__)
+        else:
+            for key in moved + added:
+                self.move(key)
+
+        self.render()
+
+    def move(self, key):
+        # Take the row out at its old sort key and insert it at its new one
+        sort_keys = self.sort_keys
+        old = sort_keys.get(key)
+        if old is not None:
+            del self.order[bisect_left(self.order, old, key=sort_keys.__getitem__)]
+        sort_keys[key] = (self.rows[key][self.sort_column], key)
+        insort(self.order, key, key=sort_keys.__getitem__)
+
+    def set_sort(self, column, reverse):
+        column = self.columns.index(column)
+        self.reverse = reverse
+        if column != self.sort_column:
+            self.sort_column = column
+            self.sort_keys = {key: (values[column], key) for key, values in self.rows.items()}
+            self.order.sort(key=self.sort_keys.__getitem__)
+        self.render()
+
+    def visible_keys(self):
+        total = len(self.order)
+        self.first = max(0, min(self.first, total - self.visible))
+        if not self.reverse:
+            return self.order[self.first:self.first + self.visible]
+        end = total - self.first
+        return self.order[max(end - self.visible, 0):end][::-1]
+
+    def render(self):
+        """Show the visible rows, from first in display order, in the tree"""
+        tree = self.tree
+        keys = self.visible_keys()
+
+        # Grow or shrink the pool of tree rows to the rows on screen
+        while len(self.slots) < len(keys):
+            self.slots.append(tree.insert('', 'end'))
+            self.shown.append(None)
+        while len(self.slots) > len(keys):
+            iid = self.slots.pop()
+            self.shown.pop()
+            self.keys.pop(iid, None)
+            tree.delete(iid)
+
+        for index, key in enumerate(keys):
+            display = self.format_row(self.rows[key])
+            shown = self.shown[index]
+            if shown is None or shown[1] != display:
+                tree.item(self.slots[index], values=display)
+            self.shown[index] = (key, display)
+            self.keys[self.slots[index]] = key
+
+        self.restore_selection()
+        self.update_scrollbar()
+
+    def restore_selection(self):
+        if not self.selected_keys and not self.applied_selection:
+            return
+        selection = tuple(iid for iid in self.slots if self.keys[iid] in self.selected_keys)
+        if selection != self.tree.selection():
+            self.applied_selection = selection
+            self.tree.selection_set(selection)
+
+    def on_select(self, event=None):
+        # Ignore the event of a selection the table restored itself
+        selection = self.tree.selection()
+        if selection != self.applied_selection:
+            self.applied_selection = selection
+            self.selected_keys = {self.keys[iid] for iid in selection if iid in self.keys}
+
+    def update_scrollbar(self):
+        if self.scrollbar is None:
+            return
+        total = len(self.order)
+        if total <= self.visible:
+            self.scrollbar.set(0, 1)
+        else:
+            self.scrollbar.set(self.first / total, (self.first + self.visible) / total)
+
+    def yview(self, *args):
+        # Scrollbar commands: ('moveto', fraction) or ('scroll', n, 'units' | 'pages')
+        if args[0] == 'moveto':
+            self.first = int(float(args[1]) * len(self.order))
+        elif args[0] == 'scroll':
+            self.first += int(args[1]) * (self.visible if args[2] == 'pages' else 1)
+        self.render()
+
+    def on_wheel(self, event):
+        if event.num == 4 or event.delta > 0:
+            self.first -= self.WHEEL_ROWS
+        else:
+            self.first += self.WHEEL_ROWS
+        self.render()
+        return 'break'
+
+    def on_resize(self, event=None):
+        # Measure a drawn row, then fit as many rows as the tree has room for
+        if self.slots:
+            bbox = self.tree.bbox(self.slots[0])
+            if bbox:
+                self.heading_height, self.row_height = bbox[1], bbox[3]
+        visible = max(1, (self.tree.winfo_height() - self.heading_height) // self.row_height)
+        if visible != self.visible:
+            self.visible = visible
+            self.render()
@@ -0,0 +1,126 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+
+class RollingHistogram:
+    """Durations of the last calls of one code path, in seconds"""
+
+    def __init__(self, size=1000):
+        self.samples = deque(maxlen=size)
+        self.calls = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.samples.append(seconds)
+        self.calls += 1
+        self.total += seconds
+
+    def summary(self):
+        # Copied first, the ingest thread may append while we sort
+        ordered = sorted(list(self.samples))
+        if not ordered:
+            return {'calls': self.calls, 'p50_ms': 0.0, 'p95_ms': 0.0, 'max_ms': 0.0, 'total_ms': 0.0}
+        return {
+            'calls': self.calls,
+            'p50_ms': ordered[len(ordered) // 2] * 1000,
+            'p95_ms': ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)] * 1000,
+            'max_ms': ordered[-1] * 1000,
+            'total_ms': self.total * 1000,
+        }
+
+
+class Timings:
+    """Rolling p50/p95/max timings of the hot paths
+
+    Tk thread paths are measured with timed() or wrap(); those calls nest
+    (update_stats calls calculate_totals) and only the outermost one adds
+    to busy_seconds. Paths on other threads report their own durations
+    through record(). Time spent inside Tk while a timed path runs is
+    added to tk_seconds by TimedInterpreter.
+    """
+
+    def __init__(self, size=1000):
+        self.size = size
+        self.histograms = {}
+        self.lock = threading.Lock()
+        self.depth = 0
+        self.busy_seconds = 0.0
+        self.tk_seconds = 0.0
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self.lock:
+                histogram = self.histograms.setdefault(name, RollingHistogram(self.size))
+        return histogram
+
+    def record(self, name, seconds):
+        self.histogram(name).add(seconds)
+
+    @contextmanager
+    def timed(self, name):
+        self.depth += 1
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            self.depth -= 1
+            if not self.depth:
+                self.busy_seconds += seconds
+            self.record(name, seconds)
+
+    def wrap(self, name, func):
+        @wraps(func)
+        def timed_func(*args, **kwargs):
+            with self.timed(name):
+                return func(*args, **kwargs)
+        return timed_func
+
+    def summary(self):
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def dump(self, path, extra=None):
+        data = {
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'busy_seconds': self.busy_seconds,
+            'tk_seconds': self.tk_seconds,
+            'paths': self.summary(),
+        }
+        if extra:
+            data.update(extra)
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+
+
+class TimedInterpreter:
+    """Stands in for a Tk interpreter and times its calls
+
+    Widgets reach Tcl through interpreter.call(), so installing this as the
+    root's .tk before any widget is created covers every Tk call. Calls
+    made outside a timed path are passed through without a clock read.
+    """
+
+    def __init__(self, interpreter, timings):
+        self.interpreter = interpreter
+        self.timings = timings
+
+    def call(self, *args):
+        timings = self.timings
+        if not timings.depth:
+            return self.interpreter.call(*args)
+        started = time.perf_counter()
+        try:
+            return self.interpreter.call(*args)
+        finally:
+            timings.tk_seconds += time.perf_counter() - started
+
+    def __getattr__(self, name):
+        # Everything else (splitlist, getint, createcommand...) is bound once
+        value = getattr(self.interpreter, name)
+        setattr(self, name, value)
+        return value
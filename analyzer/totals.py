@@ -0,0 +1,52 @@
+from collections import namedtuple
+from operator import mul
+
+try:
+    import numpy
+except ImportError:  # NumPy is optional, the pure Python path gives the same numbers
+    numpy = None
+
+SessionTotals = namedtuple('SessionTotals', 'total_gold total_exp item_totals gold_per_hour exp_per_hour')
+
+# Below this many ids the pure Python path is faster than converting to arrays
+NUMPY_MIN_SIZE = 256
+
+
+def use_numpy_for(size, use_numpy=None):
+    if use_numpy is None:
+        return numpy is not None and size >= NUMPY_MIN_SIZE
+    return use_numpy and numpy is not None
+
+
+def as_vector(values, size):
+    # Copy instead of viewing the buffer: the catalog arrays may grow on the
+    # ingest thread and an exported buffer would make that resize fail
+    return numpy.array(values[:size], dtype=numpy.int64)
+
+
+def dot(counts, weights, use_numpy=None):
+    size = min(len(counts), len(weights))
+    if use_numpy_for(size, use_numpy):
+        return int(as_vector(counts, size) @ as_vector(weights, size))
+    return sum(map(mul, counts, weights))
+
+
+def per_hour(total, elapsed_seconds):
+    if elapsed_seconds > 0:
+        return int((total * 3600) / elapsed_seconds)
+    return 0
+
+
+def session_totals(loot_counts, monster_kills, catalog, elapsed_seconds, use_numpy=None):
+    """Gold/exp totals, per-item gold indexed by item id and per-hour rates"""
+    size = min(len(loot_counts.counts), len(catalog.item_prices))
+    if use_numpy_for(size, use_numpy):
+        item_totals = as_vector(loot_counts.counts, size) * as_vector(catalog.item_prices, size)
+        total_gold = int(item_totals.sum())
+    else:
+        item_totals = list(map(mul, loot_counts.counts, catalog.item_prices))
+        total_gold = sum(item_totals)
+    total_exp = dot(monster_kills.counts, catalog.monster_exp, use_numpy)
+
+    return SessionTotals(total_gold, total_exp, item_totals,
+                         per_hour(total_gold, elapsed_seconds), per_hour(total_exp, elapsed_seconds))
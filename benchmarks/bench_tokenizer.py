@@ -0,0 +1,117 @@
+"""Lines/sec of the Loot.txt line parser, before and after the compiled tokenizer.
+
+Usage: python benchmarks/bench_tokenizer.py [lines]
+"""
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer.engine import LogParser
+from loot_generator import write_log
+
+
+class LegacyParser:
+    # The per-line code previously in MediviaAnalyzer.check_file/process_line
+    def __init__(self):
+        self.events = 0
+
+    def parse(self, lines):
+        log_section_datetime = None
+        for line in lines:
+            if "Channel saved at" in line:
+                date_str = line.replace("Channel saved at ", "").strip()
+                log_section_datetime = datetime.strptime(date_str, '%a %b %d %H:%M:%S %Y')
+                continue
+            if not log_section_datetime:
+                continue
+            timestamp_match = re.match(r'(\d{2}:\d{2})', line)
+            if timestamp_match:
+                line_time_str = timestamp_match.group(1)
+                read_line_hour = int(line_time_str.split(':')[0])
+                read_line_minute = int(line_time_str.split(':')[1])
+                log_section_datetime.replace(hour=read_line_hour, minute=read_line_minute,
+                                             second=0, microsecond=0)
+                self.process_line(line)
+
+    def process_line(self, line):
+        loot_pattern = r'Loot of ([^:]+): (.*)'
+        bag_pattern = r'Content of a bag within the corpse of ([^:]+): (.*)'
+        event_pattern = r'Looted (\d+) (\w+) points?'
+        loot_match = re.search(loot_pattern, line.strip())
+        if loot_match:
+            self.events += 1
+            self.process_items(loot_match.group(2).strip())
+            return
+        bag_match = re.search(bag_pattern, line.strip())
+        if bag_match:
+            self.process_items(bag_match.group(2).strip())
+            return
+        event_match = re.search(event_pattern, line.strip())
+        if event_match:
+            self.events += 1
+
+    def process_items(self, items_text):
+        items = [item.strip().rstrip('.').lower() for item in items_text.split(',')]
+        for item in items:
+            quantity_match = re.match(r'^(\d+)\s+(.+?)(?:\.)?$', item)
+            if quantity_match:
+                item_name = quantity_match.group(2)
+            elif item.startswith(('a ', 'an ')):
+                item_name = item[item.index(' ')+1:]
+            else:
+                item_name = item
+            item_name = self.normalize_plural(item_name)
+            if item_name not in ["bag", "empty"]:
+                self.events += 1
+
+    def normalize_plural(self, word):
+        # The baseline rules, without the irregular plurals added since
+        word = re.sub(r'^(a|an)\s+', '', word.strip())
+        keep_s = ['boots', 'legs']
+        if word.lower() in keep_s:
+            return word
+        if word.endswith('ies'):
+            return word[:-3] + 'y'
+        elif word.endswith('ves'):
+            return word[:-3] + 'f'
+        elif word.endswith('s') and not any(word.lower().endswith(x) for x in keep_s):
+            return word[:-1]
+        return word
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'Loot.txt')
+        write_log(path, lines)
+        with open(path, 'rb') as f:
+            data = f.read()
+
+    text = data.decode('utf-8')
+    start = time.perf_counter()
+    legacy = LegacyParser()
+    legacy.parse(text.splitlines(keepends=True))
+    legacy_seconds = time.perf_counter() - start
+
+    # Feed line-aligned blocks like the live tail does, dropping the events
+    parser = LogParser()
+    text_lines = text.splitlines(keepends=True)
+    blocks = [''.join(text_lines[i:i + 10000]) for i in range(0, len(text_lines), 10000)]
+    events = 0
+    start = time.perf_counter()
+    for block in blocks:
+        events += len(parser.feed(block))
+    seconds = time.perf_counter() - start
+
+    print(f"{lines:,} lines, {legacy.events:,} legacy events, {events:,} events")
+    print(f"before: {lines / legacy_seconds:>12,.0f} lines/sec ({legacy_seconds:.2f}s)")
+    print(f"after:  {lines / seconds:>12,.0f} lines/sec ({seconds:.2f}s)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Gold/exp totals, per-item totals and rates: pure Python vs NumPy.
+
+Usage: python benchmarks/bench_totals.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer.catalog import Catalog, IdCounter
+from analyzer.totals import numpy, session_totals
+
+
+def build_session(distinct_items):
+    rng = random.Random(1)
+    item_db = {f"item {i}": {'price': rng.randint(0, 5000)} for i in range(distinct_items)}
+    creature_db = {f"creature {i}": {'exp': rng.randint(5, 5000)} for i in range(200)}
+    catalog = Catalog(item_db, creature_db, {f"item {i}": 7 for i in range(0, distinct_items, 10)})
+
+    loot_counts = IdCounter(catalog.items)
+    for name in item_db:
+        loot_counts.add(name, rng.randint(1, 1000))
+    monster_kills = IdCounter(catalog.monsters)
+    for name in creature_db:
+        monster_kills.add(name, rng.randint(1, 100))
+    return catalog, loot_counts, monster_kills
+
+
+def legacy_totals(catalog, loot_counts, monster_kills):
+    # Generator sums through the name-based price lookups, as calculate_totals did
+    total_gold = sum(count * catalog.get_item_price(item) for item, count in loot_counts.items())
+    total_exp = sum(kills * catalog.get_monster_exp(monster) for monster, kills in monster_kills.items())
+    return total_gold, total_exp
+
+
+def main():
+    if numpy is None:
+        print("NumPy is not installed, only the pure Python paths are measured")
+
+    for distinct_items in (10, 1_000, 100_000):
+        catalog, loot_counts, monster_kills = build_session(distinct_items)
+        runs = max(10, 100_000 // distinct_items)
+        results = {
+            'legacy': lambda: legacy_totals(catalog, loot_counts, monster_kills),
+            'python': lambda: session_totals(loot_counts, monster_kills, catalog, 3600, use_numpy=False),
+        }
+        if numpy is not None:
+            results['numpy'] = lambda: session_totals(loot_counts, monster_kills, catalog, 3600, use_numpy=True)
+
+        expected = legacy_totals(catalog, loot_counts, monster_kills)
+        for name, run in results.items():
+            if name != 'legacy':
+                totals = run()
+                assert (totals.total_gold, totals.total_exp) == expected, name
+            seconds = timeit.timeit(run, number=runs) / runs
+            print(f"{distinct_items:>7,} items  {name:<7} {seconds * 1e6:>10,.1f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Writes realistic synthetic Loot.txt files from the creatures and items of db.json.
+
+Usage: python benchmarks/loot_generator.py OUTPUT LINES [--seed N]
+
+The log has "Channel saved at" sections, sections that cross midnight,
+bag contents, event points, plural and article item forms, gold stacks
+and unrelated channel lines.
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer.database import load_database
+from analyzer.names import plural_forms
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db.json')
+EVENT_POINT_TYPES = ('halloween', 'christmas', 'anniversary', 'demonic')
+OTHER_LINES = ('You see a dead {monster}.', 'Your last loot was not stackable.', 'Warning! The murder of a player is punished.')
+SECTION_LINES = 2000
+
+
+def plural(name):
+    # The form the client writes for stacks, e.g. "small rubies"
+    head, _, last = name.rpartition(' ')
+    if last.endswith(('s', 'x')):
+        return name
+    form = plural_forms(last)[2 if last.endswith(('y', 'f', 'fe')) else 0]
+    return f"{head} {form}" if head else form
+
+
+def article(name):
+    return f"an {name}" if name[0] in 'aeiou' else f"a {name}"
+
+
+class LootGenerator:
+    def __init__(self, item_db, creature_db, seed=1):
+        self.rng = random.Random(seed)
+        self.item_db = item_db
+        # Only creatures with a loot list make interesting corpses
+        self.creatures = [(name, [item.lower() for item in creature.get('items', [])])
+                          for name, creature in sorted(creature_db.items()) if creature.get('items')]
+        self.moment = datetime(2024, 11, 22, 18, 0)
+
+    def item_text(self, item):
+        if self.item_db.get(item, {}).get('stackable') and self.rng.random() < 0.7:
+            return f"{self.rng.randint(2, 100)} {plural(item)}"
+        return article(item)
+
+    def loot_text(self, items):
+        rng = self.rng
+        gold = rng.randint(1, 99) if rng.random() < 0.8 else 0
+        loot = ["a gold coin" if gold == 1 else f"{gold} gold coins"] if gold else []
+        loot.extend(self.item_text(item) for item in rng.sample(items, min(len(items), rng.randint(0, 3))))
+        if rng.random() < 0.1:
+            loot.append("a bag")
+        return ', '.join(loot) if loot else "nothing"
+
+    def section_header(self, saved=None):
+        saved = saved or self.moment + timedelta(minutes=1)
+        return f"Channel saved at {saved.strftime('%a %b %d %H:%M:%S %Y')}"
+
+    def lines(self, count):
+        rng = self.rng
+        written = 0
+        while written < count:
+            yield self.section_header()
+            written += 1
+            section_end = min(written + SECTION_LINES, count)
+            while written < section_end:
+                # About ten corpses per minute
+                if rng.random() < 0.1:
+                    self.moment += timedelta(minutes=1)
+                    # Now and then a section saved just after midnight starts
+                    # with lines from 23:xx of the previous day
+                    if rng.random() < 0.002 and written + 1 < section_end:
+                        self.moment = self.moment.replace(hour=23, minute=55)
+                        yield self.section_header(self.moment.replace(hour=0, minute=1) + timedelta(days=1))
+                        written += 1
+                stamp = self.moment.strftime('%H:%M')
+                monster, items = rng.choice(self.creatures)
+                roll = rng.random()
+                if roll < 0.8:
+                    yield f"{stamp} Loot of {monster}: {self.loot_text(items)}."
+                elif roll < 0.9:
+                    yield f"{stamp} Content of a bag within the corpse of {monster}: {self.loot_text(items)}."
+                elif roll < 0.93:
+                    point_type = rng.choice(EVENT_POINT_TYPES)
+                    points = rng.randint(1, 10)
+                    yield f"{stamp} Looted {points} {point_type} point{'s' if points > 1 else ''}"
+                else:
+                    yield f"{stamp} {rng.choice(OTHER_LINES).format(monster=monster)}"
+                written += 1
+
+    def write(self, path, count):
+        with open(path, 'w', encoding='utf-8') as f:
+            for line in self.lines(count):
+                f.write(line)
+                f.write('\n')
+
+
+def write_log(path, count, seed=1, db_path=DB_PATH):
+    LootGenerator(*load_database(db_path), seed=seed).write(path, count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic Loot.txt")
+    parser.add_argument('output')
+    parser.add_argument('lines', type=int)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    write_log(args.output, args.lines, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+"""Benchmark suite: parse throughput, aggregation cost, Treeview refresh time and peak RSS.
+
+Usage: python benchmarks/run_suite.py [--sizes 1000,10000,100000,1000000] [--output FILE] [--compare FILE]
+
+Every size runs in its own process on a synthetic log from loot_generator,
+so peak RSS is per size. Results are saved as JSON together with the git
+commit, so runs of different commits can be compared with --compare.
+Treeview timings need a display and are null without one.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analyzer.catalog import Catalog
+from analyzer.database import load_database
+from analyzer.engine import LogParser, LootEngine
+from analyzer.scan import scan_events
+from analyzer.totals import session_totals
+from loot_generator import DB_PATH, write_log
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+BLOCK_SIZE = 1024 * 1024
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def blocks(path):
+    # Line-aligned blocks, as the follower hands them to the parser
+    with open(path, 'rb') as f:
+        pending = b''
+        while True:
+            data = f.read(BLOCK_SIZE)
+            if not data:
+                break
+            data = pending + data
+            end = data.rfind(b'\n') + 1
+            pending = data[end:]
+            yield data[:end]
+        if pending:
+            yield pending
+
+
+def measure_tree(engine, catalog):
+    # Full insert, then a refresh where only some counts changed
+    try:
+        import tkinter as tk
+        from tkinter import ttk
+        from analyzer.table import TreeTable
+        root = tk.Tk()
+    except Exception as e:  # No tkinter, or a TclError without a display
+        print(f"Skipping Treeview timings: {e}", file=sys.stderr)
+        return None
+
+    root.withdraw()
+    columns = ("Item", "Quantity", "Price", "Total")
+    tree = ttk.Treeview(root, columns=columns, show='headings')
+    format_row = lambda values: (values[0],) + tuple(f"{value:,}" for value in values[1:])
+    table = TreeTable(tree, columns, format_row)
+
+    names = catalog.items.names
+    rows = {names[item_id]: (names[item_id], count, catalog.item_prices[item_id], count * catalog.item_prices[item_id])
+            for item_id, count in zip(engine.loot_counts.ids(), engine.loot_counts.values())}
+    started = time.perf_counter()
+    table.update(rows)
+    root.update_idletasks()
+    insert_seconds = time.perf_counter() - started
+
+    changed = {key: (row[0], row[1] + 1, row[2], row[3] + row[2]) if index % 10 == 0 else row
+               for index, (key, row) in enumerate(rows.items())}
+    started = time.perf_counter()
+    table.update(changed)
+    root.update_idletasks()
+    refresh_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    table.set_sort("Total", True)
+    root.update_idletasks()
+    sort_seconds = time.perf_counter() - started
+    root.destroy()
+    return {'rows': len(rows), 'insert_ms': insert_seconds * 1000, 'refresh_ms': refresh_seconds * 1000,
+            'sort_ms': sort_seconds * 1000}
+
+
+def run_size(lines, directory):
+    path = os.path.join(directory, f"Loot-{lines}.txt")
+    if not os.path.exists(path):
+        write_log(path, lines)
+    size = os.path.getsize(path)
+    catalog = Catalog(*load_database(DB_PATH))
+
+    # Parsing and aggregation are timed separately on the same blocks
+    parser = LogParser(normalizer=catalog.normalizer)
+    engine = LootEngine(catalog=catalog)
+    parse_seconds = aggregate_seconds = 0.0
+    events = 0
+    for data in blocks(path):
+        started = time.perf_counter()
+        batch = parser.feed(data)
+        parse_seconds += time.perf_counter() - started
+        started = time.perf_counter()
+        engine.apply(batch)
+        aggregate_seconds += time.perf_counter() - started
+        events += len(batch)
+
+    started = time.perf_counter()
+    scanned = sum(len(batch) for batch in scan_events(path, LogParser(normalizer=catalog.normalizer)))
+    scan_seconds = time.perf_counter() - started
+    assert scanned == events, (scanned, events)
+
+    # Excluding the most looted item recounts the stored events
+    top_item = max(engine.loot_counts.items(), key=lambda entry: entry[1])[0]
+    started = time.perf_counter()
+    engine.exclude_item(top_item)
+    rebuild_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    session_totals(engine.loot_counts, engine.monster_kills, catalog, 3600)
+    totals_seconds = time.perf_counter() - started
+
+    return {
+        'lines': lines,
+        'bytes': size,
+        'events': events,
+        'parse_lines_per_sec': round(lines / parse_seconds) if parse_seconds else None,
+        'parse_mb_per_sec': round(size / parse_seconds / 1e6, 2) if parse_seconds else None,
+        'scan_lines_per_sec': round(lines / scan_seconds) if scan_seconds else None,
+        'aggregate_ms': round(aggregate_seconds * 1000, 2),
+        'aggregate_ns_per_event': round(aggregate_seconds * 1e9 / events, 1) if events else None,
+        'rebuild_ms': round(rebuild_seconds * 1000, 2),
+        'totals_ms': round(totals_seconds * 1000, 3),
+        'treeview': measure_tree(engine, catalog),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, 'r') as f:
+        baseline = {entry['lines']: entry for entry in json.load(f)['results']}
+    print(f"\nCompared with {baseline_path}:")
+    for entry in results:
+        old = baseline.get(entry['lines'])
+        if old is None:
+            continue
+        for key in ('parse_lines_per_sec', 'scan_lines_per_sec', 'aggregate_ms', 'rebuild_ms', 'peak_rss_mb'):
+            if old.get(key) and entry.get(key):
+                print(f"{entry['lines']:>12,} lines  {key:<20} {old[key]:>12,} -> {entry[key]:>12,}"
+                      f"  ({entry[key] / old[key]:.2f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma separated line counts, e.g. 1000,10000000")
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--compare', help="earlier results JSON to compare with")
+    parser.add_argument('--logs', help="directory to keep the generated logs in between runs")
+    parser.add_argument('--single', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    directory = args.logs or tempfile.mkdtemp(prefix='loot-bench-')
+    os.makedirs(directory, exist_ok=True)
+
+    if args.single:
+        print(json.dumps(run_size(args.single, directory)))
+        return
+
+    results = []
+    for lines in (int(size) for size in args.sizes.split(',')):
+        child = subprocess.run([sys.executable, os.path.abspath(__file__), '--single', str(lines), '--logs', directory],
+                               capture_output=True, text=True, check=True)
+        entry = json.loads(child.stdout.strip().splitlines()[-1])
+        results.append(entry)
+        print(f"{lines:>12,} lines  parse {entry['parse_lines_per_sec']:>10,} lines/s  "
+              f"scan {entry['scan_lines_per_sec']:>10,} lines/s  aggregate {entry['aggregate_ms']:>10,} ms  "
+              f"rebuild {entry['rebuild_ms']:>8,} ms  peak {entry['peak_rss_mb']} MB")
+
+    report = {
+        'commit': git_commit(),
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results saved to {args.output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
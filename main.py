@@ -1,15 +1,47 @@
 import tkinter as tk
 from tkinter import ttk, PhotoImage, simpledialog
 from datetime import datetime, timedelta
-import re
 import os
 import sys
-import json
+import queue
+import time
+
+# Measured from here when started with --startup-time
+STARTED_AT = time.perf_counter()
+
+from analyzer import LootEngine
+from analyzer.follower import LogFollower
+from analyzer.ingest import IngestWorker
+from analyzer.history import HISTORY_FILE, HistoryWriter
+from analyzer.log_index import LogIndex
+from analyzer.rates import window_label
+from analyzer.catalog import Catalog
+from analyzer.database import load_database
+from analyzer.report import drop_rate, write_report
+from analyzer.series import TimeSeries
+from analyzer.settings import SETTINGS_FILE, SettingsStore, config_dir
+from analyzer.store import time_key
+from analyzer.table import TreeTable
+from analyzer.timings import Timings, TimedInterpreter
+from analyzer.totals import per_hour, session_totals
+
+# Tk thread paths shown in the Diagnostics tab
+TIMED_PATHS = ('drain_ingest', 'update_stats', 'calculate_totals', 'update_graph', 'draw_graph')
+# The graphs show the last hour; the buffers hold one point a minute for a 12 hour hunt
+GRAPH_WINDOW = timedelta(hours=1)
+GRAPH_CAPACITY = 12 * 60
 
 class MediviaAnalyzer(tk.Tk):
     def __init__(self):
         super().__init__()
 
+        # Hot path timings for the Diagnostics tab; every widget below talks
+        # to Tcl through the timed interpreter
+        self.timings = Timings()
+        self.tk = TimedInterpreter(self.tk, self.timings)
+        for name in TIMED_PATHS:
+            setattr(self, name, self.timings.wrap(name, getattr(self, name)))
+
         # Set up dark theme
         self.style = ttk.Style()
         self.style.theme_use('default')
@@ -106,28 +138,36 @@ class MediviaAnalyzer(tk.Tk):
         self.iconphoto(False, PhotoImage(file=self.resource_path('analyzer.ico')))
 
         # Initialize data structures
-        self.monster_kills = {}
-        self.loot_counts = {}
-        self.custom_item_prices = {}
-        self.total_gold = 0
-        self.total_exp = 0
         self.last_update = None
+        self.label_texts = {}
         self.start_time = datetime.now()
-        self.last_position = 0
         self.log_file = os.path.expanduser("~/medivia/Loot.txt")
-        self.check_interval = 10000
+        self.follower = LogFollower(self.log_file)
         self.resize_timer = None
-        self.monster_drops = {}  # Format: {monster_name: {item_name: [(quantity, count)]}}
-        self.item_sources = {}   # Format: {item_name: set(monster_names)}
+
+        # Parsing and counters live in the engine, the window only renders them
+        self.engine = LootEngine(self.start_time, catalog=self.catalog)
+        # The log is read and parsed on a worker thread that sends deltas
+        self.ingest = IngestWorker(self.follower, self.engine, index=LogIndex(self.log_file), timings=self.timings)
+        self.ingest_generation = 0
+        self.frame_budget = 0.008
+        # Every session's events and totals are kept in a local database,
+        # written from a background thread
+        self.history = HistoryWriter(os.path.join(config_dir(), HISTORY_FILE), legacy_path=HISTORY_FILE)
+        self.session_id = self.history.start_session(self.start_time, self.log_file)
+        # Settings are written off the Tk thread, at most once every 2 seconds
+        self.settings_store = SettingsStore(os.path.join(config_dir(), SETTINGS_FILE), legacy_path=SETTINGS_FILE)
 
         self.setup_ui()
         self.load_settings()
         self.update_timer()
         self.setup_about_tab()
+        self.setup_diagnostics_tab()
         self.bind('<Configure>', self.on_resize)
+        self.protocol('WM_DELETE_WINDOW', self.on_close)
         
-        self.check_file()
-        self.after(self.check_interval, self.periodic_check)
+        self.ingest.start()
+        self.drain_ingest()
 
 
     def setup_ui(self):
@@ -141,6 +181,15 @@ class MediviaAnalyzer(tk.Tk):
         )
         export_button.pack(side=tk.RIGHT, padx=(10, 0))
 
+        # Gold/Hour and Exp/Hour over the session or a rolling window
+        self.rate_choices = {"Session": None}
+        self.rate_choices.update((window_label(window), window) for window in self.engine.rates.windows)
+        self.rate_choice = tk.StringVar(value="Session")
+        rate_box = ttk.Combobox(top_frame, textvariable=self.rate_choice, values=list(self.rate_choices),
+                                state='readonly', width=8)
+        rate_box.pack(side=tk.RIGHT, padx=(10, 0))
+        rate_box.bind('<<ComboboxSelected>>', self.change_rate_window)
+
         # Stats frame on the left
         stats_frame = ttk.Frame(top_frame)
         stats_frame.pack(side=tk.LEFT, fill=tk.X, expand=True)
@@ -206,6 +255,12 @@ class MediviaAnalyzer(tk.Tk):
         self.monster_tree.column("Exp/Kill", width=100, anchor='center')
         self.monster_tree.column("Total Exp", width=100, anchor='center')
 
+        # Row-keyed view models so refreshes only touch rows that changed
+        format_row = lambda values: (values[0],) + tuple(f"{value:,}" for value in values[1:])
+        self.loot_table = TreeTable(self.loot_tree, ("Item", "Quantity", "Price", "Total"), format_row)
+        self.monster_table = TreeTable(self.monster_tree, ("Monster", "Kills", "Exp/Kill", "Total Exp"), format_row)
+        self.tables = {str(self.loot_tree): self.loot_table, str(self.monster_tree): self.monster_table}
+
         # Create context menus for loot and monster tables
         self.loot_context_menu = tk.Menu(self, tearoff=0)
         self.loot_context_menu.add_command(
@@ -413,6 +468,14 @@ class MediviaAnalyzer(tk.Tk):
         self.custom_prices_tree.heading("Price", text="Price") 
         self.custom_prices_tree.column("Item", width=200, anchor='center')
         self.custom_prices_tree.column("Price", width=100, anchor='center')
+
+        # The exclusion and price lists are keyed by name like the stats tables
+        self.excluded_items_table = TreeTable(self.excluded_items_tree, ("Item",), tuple)
+        self.excluded_monsters_table = TreeTable(self.excluded_monsters_tree, ("Monster",), tuple)
+        self.custom_prices_table = TreeTable(self.custom_prices_tree, ("Item", "Price"),
+                                             lambda values: (values[0], f"{values[1]:,}"))
+        for table in (self.excluded_items_table, self.excluded_monsters_table, self.custom_prices_table):
+            self.tables[str(table.tree)] = table
         # self.custom_prices_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=(0,10))
 
         # Context menu
@@ -429,11 +492,11 @@ class MediviaAnalyzer(tk.Tk):
         self.custom_prices_tree.bind('<Button-3>', self.show_prices_context_menu)
         self.custom_prices_tree.bind('<Double-1>', self.edit_custom_price_entry)
 
-        # Add scrollbars
+        # Add scrollbars; they scroll the tables' models, the trees only hold the visible rows
         for tree, frame in [(self.monster_tree, monsters_frame), (self.loot_tree, loot_frame), (self.custom_prices_tree, prices_tree_frame), (self.excluded_monsters_tree, excluded_monsters_tree_frame), (self.excluded_items_tree, excluded_items_tree_frame)]:
-            scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=tree.yview, style='Custom.Vertical.TScrollbar')
+            scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, style='Custom.Vertical.TScrollbar')
             scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-            tree.configure(yscrollcommand=scrollbar.set)
+            self.tables[str(tree)].attach_scrollbar(scrollbar)
             tree.pack(fill=tk.BOTH, expand=True)
 
         # Add hover effects to treeview rows
@@ -491,9 +554,6 @@ class MediviaAnalyzer(tk.Tk):
         if selected:
             item = self.loot_tree.item(selected[0])['values'][0]
             self.add_to_exclude_list(self.excluded_items_tree, item)
-            # Remove from loot counts and update display
-            if item in self.loot_counts:
-                del self.loot_counts[item]
             self.update_stats()
             self.calculate_totals()
 
@@ -502,9 +562,6 @@ class MediviaAnalyzer(tk.Tk):
         if selected:
             monster = self.monster_tree.item(selected[0])['values'][0]
             self.add_to_exclude_list(self.excluded_monsters_tree, monster)
-            # Remove from monster kills and update display
-            if monster in self.monster_kills:
-                del self.monster_kills[monster]
             self.update_stats()
             self.calculate_totals()
 
@@ -544,7 +601,7 @@ class MediviaAnalyzer(tk.Tk):
         def save_price(event=None):
             try:
                 new_price = int(entry.get())
-                self.custom_item_prices[item_name] = new_price
+                self.engine.set_custom_price(item_name, new_price)
                 entry.destroy()
                 self.update_custom_prices_tree()
                 self.update_stats()
@@ -561,14 +618,8 @@ class MediviaAnalyzer(tk.Tk):
 
     def on_resize(self, event):
         # Force graph redraw on window resize
-        current_time = datetime.now()
-        elapsed_seconds = (current_time - self.start_time).total_seconds()
-        if elapsed_seconds > 0:
-            gold_per_hour = int((self.total_gold * 3600) / elapsed_seconds)
-            exp_per_hour = int((self.total_exp * 3600) / elapsed_seconds)
-            
-            self.update_graph(self.gold_graph, gold_per_hour, current_time)
-            self.update_graph(self.exp_graph, exp_per_hour, current_time)
+        self.draw_graph(self.gold_graph)
+        self.draw_graph(self.exp_graph)
 
         # Cancel previous timer if it exists
         if self.resize_timer is not None:
@@ -591,7 +642,7 @@ class MediviaAnalyzer(tk.Tk):
         except ValueError:
             price = 0
         
-        self.custom_item_prices[item] = price
+        self.engine.set_custom_price(item, price)
         self.custom_item_var.set("")
         self.custom_price_var.set("0")
         self.update_custom_prices_tree()
@@ -612,11 +663,9 @@ class MediviaAnalyzer(tk.Tk):
             item_id = selected[0]
             item_name = str(self.custom_prices_tree.item(item_id)['values'][0])
             # Remove from prices dictionary
-            if item_name in self.custom_item_prices:
-                del self.custom_item_prices[item_name]
-                print("Removed item:", self.custom_item_prices)
-            # Remove from tree
-            self.custom_prices_tree.delete(item_id)
+            if item_name in self.catalog.custom_item_prices:
+                self.engine.remove_custom_price(item_name)
+                print("Removed item:", self.catalog.custom_item_prices)
             self.update_custom_prices_tree()
 
             self.save_settings()
@@ -624,29 +673,31 @@ class MediviaAnalyzer(tk.Tk):
             self.calculate_totals()
 
     def update_custom_prices_tree(self):
-        for item in self.custom_prices_tree.get_children():
-            self.custom_prices_tree.delete(item)
-            
-        for item, price in self.custom_item_prices.items():
-            self.custom_prices_tree.insert('', tk.END, values=(item, f"{price:,}"))
+        self.custom_prices_table.update({item: (item, price) for item, price in self.catalog.custom_item_prices.items()})
+
+    def update_excluded_trees(self):
+        # The tables only render the engine's exclusion sets
+        self.excluded_items_table.update({name: (name,) for name in self.engine.excluded_items})
+        self.excluded_monsters_table.update({name: (name,) for name in self.engine.excluded_monsters})
 
     def add_to_exclude_list(self, treeview, item):
         if item:
             item = item.strip().lower()
-            if item not in [treeview.item(child)['values'][0].lower() for child in treeview.get_children()]:
-                item_id = treeview.insert('', tk.END, values=(item, "Remove"))
+            if treeview == self.excluded_items_tree:
+                excluded = self.engine.excluded_items
+            else:
+                excluded = self.engine.excluded_monsters
+
+            if item not in excluded:
                 if treeview == self.excluded_items_tree:
                     self.excluded_items_var.set("")
                     # Remove excluded item from loot counts and recalculate
-                    if item in self.loot_counts:
-                        del self.loot_counts[item]
+                    self.engine.exclude_item(item)
                 else:
                     self.excluded_monsters_var.set("")
                     # Remove excluded monster from kills and recalculate
-                    if item in self.monster_kills:
-                        del self.monster_kills[item]
-                
-                treeview.tag_bind(item_id, '', lambda e: self.handle_remove_click(e, treeview))
+                    self.engine.exclude_monster(item)
+                self.update_excluded_trees()
 
                 self.save_settings()
                 self.update_stats()
@@ -665,28 +716,20 @@ class MediviaAnalyzer(tk.Tk):
     def remove_selected_item(self, treeview):
         selected_item = treeview.selection()
         if selected_item:
-            item = treeview.item(selected_item)['values'][0]
-            treeview.delete(selected_item)
+            item = str(treeview.item(selected_item)['values'][0])
+            if treeview == self.excluded_items_tree:
+                self.engine.include_item(item)
+            else:
+                self.engine.include_monster(item)
+            self.update_excluded_trees()
 
             self.save_settings()
-            self.reprocess_log_file()
             self.update_stats()
             self.calculate_totals()
 
-    def reprocess_log_file(self):
-        # Clear current counts
-        self.monster_kills.clear()
-        self.loot_counts.clear()
-        
-        # Store current position
-        current_position = self.last_position
-        self.last_position = 0
-        
-        # Reprocess file
-        self.check_file()
-        
-        # Restore position
-        self.last_position = current_position
+    def restart_ingest(self):
+        self.ingest_generation += 1
+        self.ingest.restart(self.ingest_generation, self.start_time)
 
     def add_custom_item(self):
         item_name = simpledialog.askstring("Add Custom Item", "Enter item name:")
@@ -694,7 +737,7 @@ class MediviaAnalyzer(tk.Tk):
             item_name = item_name.strip()
             price = simpledialog.askinteger("Add Custom Item", "Enter item price:")
             if price is not None:
-                self.custom_item_prices[item_name] = price
+                self.engine.set_custom_price(item_name, price)
                 self.save_settings()
                 self.update_custom_items_tree()
 
@@ -702,7 +745,7 @@ class MediviaAnalyzer(tk.Tk):
         selected_item = self.custom_items_tree.focus()
         if selected_item:
             item_name = self.custom_items_tree.item(selected_item)['values'][0]
-            del self.custom_item_prices[item_name]
+            self.engine.remove_custom_price(item_name)
             self.save_settings()
             self.update_custom_items_tree()
 
@@ -710,7 +753,7 @@ class MediviaAnalyzer(tk.Tk):
         for item in self.custom_items_tree.get_children():
             self.custom_items_tree.delete(item)
 
-        for item, price in self.custom_item_prices.items():
+        for item, price in self.catalog.custom_item_prices.items():
             self.custom_items_tree.insert('', tk.END, values=(item, price))
 
     def format_number(self, num):
@@ -734,32 +777,41 @@ class MediviaAnalyzer(tk.Tk):
         
         # Store additional properties with the canvas
         canvas.title = title
-        canvas.data_points = []
+        canvas.title_label = title_label
+        canvas.series = TimeSeries(GRAPH_CAPACITY)
         canvas.last_update = None
+
+        # The line and the Y-axis labels are created once and moved on redraw
+        canvas.line = canvas.create_line(0, 0, 0, 0, fill='#ff4444', width=2, smooth=True, state='hidden')
+        canvas.y_labels = [
+            canvas.create_text(0, 0, fill='#ffffff', anchor='e', font=('TkDefaultFont', 8), state='hidden')
+            for _ in range(3)
+        ]
         
         return canvas
 
     def update_graph(self, canvas, new_value, timestamp):
-        # Store the new data point
-        canvas.data_points.append((timestamp, new_value))
-        
-        # Keep only last hour of data
-        cutoff_time = timestamp - timedelta(hours=1)
-        canvas.data_points = [(t, v) for t, v in canvas.data_points if t > cutoff_time]
-        
-        # Clear canvas
-        canvas.delete('all')
-        
-        if len(canvas.data_points) < 2:
-            return
+        canvas.series.append(timestamp.timestamp(), new_value)
+        self.draw_graph(canvas, timestamp)
+
+    def draw_graph(self, canvas, now=None):
+        now = now or datetime.now()
 
         # Ensure canvas is updated with current size
         width = canvas.winfo_width() or 200
         height = canvas.winfo_height() or 100
         padding = 25  # Space for labels
+
+        # Last hour of data, at most a min and a max per pixel column
+        points = canvas.series.downsample(max(int(width - 2*padding), 1), (now - GRAPH_WINDOW).timestamp())
+        if len(points) < 2:
+            canvas.itemconfigure(canvas.line, state='hidden')
+            for label in canvas.y_labels:
+                canvas.itemconfigure(label, state='hidden')
+            return
         
         # Calculate value range
-        values = [v for _, v in canvas.data_points]
+        values = [v for _, v in points]
         min_val = max(0, min(values))  # Ensure min is not negative
         max_val = max(values)
         value_range = max_val - min_val
@@ -770,38 +822,28 @@ class MediviaAnalyzer(tk.Tk):
             min_val = 0
             max_val += value_range
         
-        # Draw Y-axis labels (right side)
-        num_y_labels = 3
-        for i in range(num_y_labels):
+        # Y-axis labels (right side)
+        num_y_labels = len(canvas.y_labels)
+        for i, label in enumerate(canvas.y_labels):
             y_pos = padding + (height - 2*padding) * (1 - i/(num_y_labels-1))
             value = min_val + (value_range * i/(num_y_labels-1))
-            canvas.create_text(
-                width-5, y_pos,
-                text=self.format_number(value),
-                fill='#ffffff',
-                anchor='e',
-                font=('TkDefaultFont', 8)
-            )
-        
-        # Draw the line
+            canvas.coords(label, width-5, y_pos)
+            canvas.itemconfigure(label, text=self.format_number(value), state='normal')
+        
+        # Move the line to the new points
+        earliest_time = points[0][0]
+        time_range = points[-1][0] - earliest_time
+        if time_range <= 0:
+            canvas.itemconfigure(canvas.line, state='hidden')
+            return
+
         coords = []
-        earliest_time = canvas.data_points[0][0]
-        latest_time = canvas.data_points[-1][0]
-        
-        if (latest_time - earliest_time).total_seconds() > 0:
-            for timestamp, value in canvas.data_points:
-                x = padding + (width - 2*padding) * ((timestamp - earliest_time).total_seconds() /
-                                                (latest_time - earliest_time).total_seconds())
-                y = padding + (height - 2*padding) * (1 - (value - min_val) / value_range)
-                coords.extend([x, y])
-            
-        if len(coords) >= 4:
-            canvas.create_line(
-                coords,
-                fill='#ff4444',
-                width=2,
-                smooth=True
-            )
+        for timestamp, value in points:
+            x = padding + (width - 2*padding) * ((timestamp - earliest_time) / time_range)
+            y = padding + (height - 2*padding) * (1 - (value - min_val) / value_range)
+            coords.extend([x, y])
+        canvas.coords(canvas.line, coords)
+        canvas.itemconfigure(canvas.line, state='normal')
 
     def update_timer(self):
         elapsed = datetime.now() - self.start_time
@@ -816,443 +858,221 @@ class MediviaAnalyzer(tk.Tk):
         self.after(1000, self.update_timer)
 
     def load_database(self):
+        started = time.perf_counter()
         try:
-            with open(self.resource_path('db.json'), 'r') as f:
-                data = json.load(f)
-                self.item_db = {item['name'].lower(): item for item in data['items']}
-                self.creature_db = {creature['name'].lower(): creature for creature in data['creatures']}
-                print(f"Loaded database with {len(self.item_db)} items and {len(self.creature_db)} creatures.")
+            # The parsed database is cached next to the settings file
+            cache_path = os.path.join(config_dir(), 'db.json.cache')
+            self.item_db, self.creature_db = load_database(self.resource_path('db.json'), cache_path)
+            print(f"Loaded database with {len(self.item_db)} items and {len(self.creature_db)} creatures.")
         except Exception as e:
             print(f"Error loading database: {e}")
             self.item_db = {}
             self.creature_db = {}
 
-    def periodic_check(self):
-        self.check_file()
-        self.after(self.check_interval, self.periodic_check)
-
-    def check_file(self):
-        try:
-            if not os.path.exists(self.log_file):
-                return
-
-            with open(self.log_file, 'r', encoding='utf-8') as file:
-                file.seek(self.last_position)
-                new_lines = file.readlines()
-                self.last_position = file.tell()
-
-                log_section_datetime = None
-                for line in new_lines:
-                    # Extract channel saved date
-                    if "Channel saved at" in line:
-                        date_str = line.replace("Channel saved at ", "").strip()
-                        log_section_datetime = datetime.strptime(date_str, '%a %b %d %H:%M:%S %Y')
-                        continue
-
-                    # Skip if we haven't found a channel saved date yet
-                    if not log_section_datetime:
-                        continue
-
-                    # Extract timestamp from line
-                    timestamp_match = re.match(r'(\d{2}:\d{2})', line)
-                    if timestamp_match:
-                        line_time_str = timestamp_match.group(1)
-                        # Create a datetime object for the line by combining current_date with line time
-                            
-                        try:
-                            read_line_hour = int(line_time_str.split(':')[0])
-                            read_line_minute = int(line_time_str.split(':')[1])
-
-                            if (log_section_datetime.hour == 0 and read_line_hour == 23):
-                                line_datetime = log_section_datetime.replace(
-                                    day=log_section_datetime.day - 1,
-                                    hour=read_line_hour,
-                                    minute=read_line_minute,
-                                    second=0,
-                                    microsecond=0
-                                )
-                            else:
-                                line_datetime = log_section_datetime.replace(
-                                    hour=read_line_hour,
-                                    minute=read_line_minute,
-                                    second=0,
-                                    microsecond=0
-                                )
-                        except ValueError as e:
-                            print(f"ValueError: {e}, Line: {line}")
-                            continue # Skip to the next line
-
-                        # Process line if it's after start_time
-                        if line_datetime >= self.start_time:
-                            self.process_line(line)
-
-                self.update_stats()
+        # Dense ids plus price/exp vectors for every item and creature
+        self.catalog = Catalog(self.item_db, self.creature_db)
+        self.database_seconds = time.perf_counter() - started
+
+    def drain_ingest(self):
+        # Apply worker deltas within a per-frame time budget to keep Tk responsive
+        deadline = time.perf_counter() + self.frame_budget
+        applied = False
+        backlog = False
+        while True:
+            if time.perf_counter() >= deadline:
+                backlog = True
+                break
+            try:
+                generation, delta = self.ingest.deltas.get_nowait()
+            except queue.Empty:
+                break
+            # Skip batches parsed before the last reset
+            if generation != self.ingest_generation:
+                continue
+            self.engine.merge(delta)
+            applied = True
 
-        except Exception as e:
-            print(f"Error reading file: {e}")
+        if applied:
+            self.update_stats()
+        self.after(16 if backlog else 50, self.drain_ingest)
 
-    def normalize_plural(self, word):
-        # Remove articles and trim
-        word = re.sub(r'^(a|an)\s+', '', word.strip())
-        
-        # Special cases that should keep their 's'
-        keep_s = ['boots', 'legs']
-        if word.lower() in keep_s:
-            return word
-            
-        # Handle special plural cases
-        if word.endswith('ies'):
-            return word[:-3] + 'y'
-        elif word.endswith('ves'):
-            return word[:-3] + 'f'
-        elif word.endswith('s') and not any(word.lower().endswith(x) for x in keep_s):
-            return word[:-1]
-        
-        return word
-
-    def process_line(self, line):
-        loot_pattern = r'Loot of ([^:]+): (.*)'
-        bag_pattern = r'Content of a bag within the corpse of ([^:]+): (.*)'
-        event_pattern = r'Looted (\d+) (\w+) points?'
-        
-        # Check for regular loot
-        loot_match = re.search(loot_pattern, line.strip())
-        if loot_match:
-            monster_name = loot_match.group(1).strip()
-            items_text = loot_match.group(2).strip()
-            
-            # Update monster kills only if not excluded
-            excluded_monsters = [self.excluded_monsters_tree.item(child)['values'][0].lower()
-                            for child in self.excluded_monsters_tree.get_children()]
-            
-            if monster_name not in excluded_monsters:
-                self.monster_kills[monster_name] = self.monster_kills.get(monster_name, 0) + 1
-            
-            self.process_items(items_text, monster_name)
-            return
-        
-        # Check for bag contents
-        bag_match = re.search(bag_pattern, line.strip())
-        if bag_match:
-            current_monster = bag_match.group(1).strip()
-            items_text = bag_match.group(2).strip()
-            self.process_items(items_text, current_monster)
-            return
-        
-        # Check for event points
-        event_match = re.search(event_pattern, line.strip())
-        if event_match:
-            quantity = int(event_match.group(1))
-            point_type = f"{event_match.group(2).lower()} point"
-            self.loot_counts[point_type] = self.loot_counts.get(point_type, 0) + quantity
-            return
+    def save_history(self):
+        # Only the snapshot is taken here, the writer thread does the inserts
+        self.history.save(self.session_id, self.engine, datetime.now())
 
-    def process_items(self, items_text, monster_name=None):
-        excluded_items = [self.excluded_items_tree.item(child)['values'][0].lower() 
-                        for child in self.excluded_items_tree.get_children()]
-        
-        # Initialize monster tracking
-        if monster_name and monster_name not in self.monster_drops:
-            self.monster_drops[monster_name] = {}
-            
-        items = [item.strip().rstrip('.').lower() for item in items_text.split(',')]
-        
-        for item in items:
-            # Handle items with explicit quantities
-            quantity_match = re.match(r'^(\d+)\s+(.+?)(?:\.)?$', item)
-            if quantity_match:
-                quantity = int(quantity_match.group(1))
-                item_name = quantity_match.group(2)
-            # Handle items with "a" or "an"
-            elif item.startswith(('a ', 'an ')):
-                quantity = 1
-                item_name = item[item.index(' ')+1:]
-            else:
-                quantity = 1
-                item_name = item
-
-            # Normalize item name
-            item_name = self.normalize_plural(item_name)
-                
-            if item_name in ["bag", "empty"] or item_name in excluded_items:
-                continue
-                
-            # Track each drop as a single instance with its quantity
-            if monster_name:
-                if item_name not in self.monster_drops[monster_name]:
-                    self.monster_drops[monster_name][item_name] = []
-                # Store just one entry per drop instance
-                self.monster_drops[monster_name][item_name].append(quantity)
-                
-                # Track item sources
-                if item_name not in self.item_sources:
-                    self.item_sources[item_name] = set()
-                self.item_sources[item_name].add(monster_name)
-                
-            # Update total counts
-            if item_name not in excluded_items:
-                self.loot_counts[item_name] = self.loot_counts.get(item_name, 0) + quantity
+    def on_close(self):
+        self.settings_store.close()
+        self.ingest.stop()
+        self.save_history()
+        self.history.close()
+        self.destroy()
 
     def calculate_drop_stats(self, item_name, monster_name):
-        if monster_name not in self.monster_drops or item_name not in self.monster_drops[monster_name]:
+        if monster_name not in self.engine.monster_drops or item_name not in self.engine.monster_drops[monster_name]:
             return None, "0"
             
-        kills = self.monster_kills.get(monster_name, 0)
+        kills = self.engine.monster_kills.get(monster_name, 0)
         if kills == 0:
             return None, "0"
             
-        # Get all drop instances for this item from this monster
-        drop_instances = len(self.monster_drops[monster_name][item_name])
-        quantities = self.monster_drops[monster_name][item_name]
+        # Drop statistics for this item from this monster
+        drops = self.engine.monster_drops[monster_name][item_name]
         
         # Calculate true drop rate based on number of corpses that dropped the item
-        drop_rate = (drop_instances / kills) * 100
-        
-        # Calculate quantity statistics
-        min_qty = min(quantities)
-        max_qty = max(quantities)
-        avg_qty = sum(quantities) / len(quantities)
-        qty_range = f"{min_qty}-{max_qty}" if min_qty != max_qty else str(min_qty)
+        drop_rate = (drops.count / kills) * 100
         
         # Format the statistics string
-        stats = f"{drop_rate:.2f}%, avg: {avg_qty:.1f}, range: {qty_range}"
+        stats = f"{drop_rate:.2f}%, avg: {drops.mean:.1f}, range: {drops.quantity_range()}"
         
         return drop_rate, stats
     
     def calculate_drop_rate(self, item_name):
-        if item_name not in self.item_sources:
-            return "0%"
-            
-        total_drops = 0
-        total_kills = 0
-        
-        # Calculate drops across all monsters
-        for monster in self.item_sources[item_name]:
-            if monster in self.monster_kills:
-                total_kills += self.monster_kills[monster]
-                if monster in self.monster_drops and item_name in self.monster_drops[monster]:
-                    total_drops += len(self.monster_drops[monster][item_name])
-                    
-        if total_kills == 0:
-            return "0%"
-            
-        drop_rate = (total_drops / total_kills) * 100
-        return f"{drop_rate:.2f}%"
+        return drop_rate(self.engine, item_name)
 
     def get_monster_specific_drop_rate(self, item_name, monster_name):
-        if monster_name not in self.monster_kills or monster_name not in self.monster_drops:
+        if monster_name not in self.engine.monster_kills or monster_name not in self.engine.monster_drops:
             return "0%"
             
-        kills = self.monster_kills[monster_name]
-        drops = self.monster_drops[monster_name].get(item_name, 0)
+        kills = self.engine.monster_kills[monster_name]
+        drops = self.engine.monster_drops[monster_name].get(item_name)
         
-        if kills == 0:
+        if kills == 0 or not drops:
             return "0%"
             
-        drop_rate = (drops / kills) * 100
+        drop_rate = (drops.count / kills) * 100
         return f"{drop_rate:.2f}%"
 
     def get_item_price(self, item_name):
-        item_name = item_name.lower()
-        if item_name == "gold coin":
-            return 1
-        elif item_name == "platinum coin":
-            return 100
-        elif item_name == "crystal coin":
-            return 10000
-        elif item_name in self.custom_item_prices:
-            return self.custom_item_prices[item_name]
-        else:
-            return self.item_db.get(item_name, {}).get('price', 0)
+        return self.catalog.get_item_price(item_name)
 
     def get_monster_exp(self, monster_name):
-        return self.creature_db.get(monster_name.lower(), {}).get('exp', 0)
+        return self.catalog.get_monster_exp(monster_name)
+
+    @property
+    def total_gold(self):
+        return self.engine.total_gold
+
+    @property
+    def total_exp(self):
+        return self.engine.total_exp
+
+    def set_label_text(self, label, text):
+        # Skip the Tk call when the text did not change
+        if self.label_texts.get(str(label)) != text:
+            self.label_texts[str(label)] = text
+            label.config(text=text)
+
+    def change_rate_window(self, event=None):
+        # The graphs restart with values of the new window
+        self.update_rate_titles()
+        for graph in (self.gold_graph, self.exp_graph):
+            graph.series.clear()
+        self.last_update = None
+        self.save_settings()
+        self.calculate_totals()
+
+    def update_rate_titles(self):
+        # The graph titles name the window the plotted values are for
+        for graph in (self.gold_graph, self.exp_graph):
+            self.set_label_text(graph.title_label, f"{graph.title} ({self.rate_choice.get()})")
+
+    def current_rates(self, current_time, elapsed_seconds):
+        # Session average, or the selected rolling window ending now; the
+        # windows are moved to now either way so exports see the same rates
+        self.engine.rates.advance(time_key(current_time) // 60)
+        window = self.rate_choices.get(self.rate_choice.get())
+        if window is None:
+            return per_hour(self.total_gold, elapsed_seconds), per_hour(self.total_exp, elapsed_seconds)
+        return self.engine.rates.per_hour(window, elapsed_seconds)
 
     def calculate_totals(self):
-        self.total_gold = sum(count * self.get_item_price(item) for item, count in self.loot_counts.items())
-        self.total_exp = sum(kills * self.get_monster_exp(monster) for monster, kills in self.monster_kills.items())
-        
-        # Calculate per hour rates
-        elapsed_seconds = (datetime.now() - self.start_time).total_seconds()
-        if elapsed_seconds > 0:
-            gold_per_hour = int((self.total_gold * 3600) / elapsed_seconds)
-            exp_per_hour = int((self.total_exp * 3600) / elapsed_seconds)
-        else:
-            gold_per_hour = 0
-            exp_per_hour = 0
+        # Totals are kept up to date by the engine, only the rates are computed here
+        current_time = datetime.now()
+        elapsed_seconds = (current_time - self.start_time).total_seconds()
+        gold_per_hour, exp_per_hour = self.current_rates(current_time, elapsed_seconds)
 
         # Update labels and graphs
-        self.total_gold_label.config(text=f"Total Gold: {self.total_gold:,}")
-        self.total_exp_label.config(text=f"Total Exp: {self.total_exp:,}")
-        self.gold_per_hour_label.config(text=f"Gold/Hour: {gold_per_hour:,}")
-        self.exp_per_hour_label.config(text=f"Exp/Hour: {exp_per_hour:,}")
-        
-        # Update graphs
-        current_time = datetime.now()
+        self.set_label_text(self.total_gold_label, f"Total Gold: {self.total_gold:,}")
+        self.set_label_text(self.total_exp_label, f"Total Exp: {self.total_exp:,}")
+        self.set_label_text(self.gold_per_hour_label, f"Gold/Hour: {gold_per_hour:,}")
+        self.set_label_text(self.exp_per_hour_label, f"Exp/Hour: {exp_per_hour:,}")
         
         # Only update graphs if we have new data
         if self.last_update is None or (current_time - self.last_update).total_seconds() >= 60:
-            elapsed_seconds = (current_time - self.start_time).total_seconds()
             if elapsed_seconds > 0:
-                gold_per_hour = int((self.total_gold * 3600) / elapsed_seconds)
-                exp_per_hour = int((self.total_exp * 3600) / elapsed_seconds)
-                
                 self.update_graph(self.gold_graph, gold_per_hour, current_time)
                 self.update_graph(self.exp_graph, exp_per_hour, current_time)
+                self.save_history()
                 
                 self.last_update = current_time
 
     def update_stats(self):
-        # Clear existing items
-        for tree in (self.loot_tree, self.monster_tree):
-            for item in tree.get_children():
-                tree.delete(item)
-                
+        elapsed_seconds = (datetime.now() - self.start_time).total_seconds()
+        totals = session_totals(self.engine.loot_counts, self.engine.monster_kills, self.catalog, elapsed_seconds)
+
         # Update loot table
-        for item, count in sorted(self.loot_counts.items()):
-            price = self.get_item_price(item)
-            total = price * count
-            drop_rate = self.calculate_drop_rate(item)
-            
-            self.loot_tree.insert('', tk.END, values=(
-                item,
-                f"{count:,}",
-                f"{price:,}",
-                f"{total:,}",
-                drop_rate
-            ))
+        loot_rows = {}
+        item_names = self.catalog.items.names
+        loot_counts = self.engine.loot_counts.counts
+        for item_id in self.engine.loot_counts.ids():
+            item = item_names[item_id]
+            loot_rows[item] = (item, loot_counts[item_id], self.catalog.item_prices[item_id], int(totals.item_totals[item_id]))
+        self.loot_table.update(loot_rows)
             
         # Update monster table
-        for monster, kills in sorted(self.monster_kills.items()):
-            exp = self.get_monster_exp(monster)
-            total_exp = exp * kills
-            
-            self.monster_tree.insert('', tk.END, values=(
-                monster,
-                f"{kills:,}",
-                f"{exp:,}",
-                f"{total_exp:,}"
-            ))
+        monster_rows = {}
+        monster_names = self.catalog.monsters.names
+        monster_kills = self.engine.monster_kills.counts
+        for monster_id in self.engine.monster_kills.ids():
+            monster = monster_names[monster_id]
+            kills = monster_kills[monster_id]
+            exp = self.catalog.monster_exp[monster_id]
+            monster_rows[monster] = (monster, kills, exp, exp * kills)
+        self.monster_table.update(monster_rows)
             
         self.calculate_totals()
 
     def treeview_sort_column(self, tree, col, reverse):
-        items = [(tree.set(item, col), item) for item in tree.get_children('')]
-        
-        # Convert counts to numbers for proper sorting
-        if col in ("Quantity", "Kills", "Price", "Total", "Exp/Kill", "Total Exp"):
-            items = [(int(str(value).replace(',', '')), item) for value, item in items]
-        
-        items.sort(reverse=reverse)
-        
-        for index, (val, item) in enumerate(items):
-            tree.move(item, '', index)
-        
+        self.apply_sort(tree, col, reverse)
+        self.save_settings()
+
+    def apply_sort(self, tree, col, reverse):
+        # The table sorts its model on the raw values and keeps the order
+        # through refreshes; the tree only shows the visible rows
+        self.tables[str(tree)].set_sort(col, reverse)
+
         tree.heading(col, command=lambda: self.treeview_sort_column(tree, col, not reverse))
 
+    def sort_settings(self):
+        return {name: [table.columns[table.sort_column], table.reverse]
+                for name, table in (('loot', self.loot_table), ('monsters', self.monster_table))}
+
     def reset_analyzer(self):
-        self.monster_kills.clear()
-        self.loot_counts.clear()
-        self.total_gold = 0
-        self.total_exp = 0
+        # Close the current session in the history before starting a new one
+        self.save_history()
         self.start_time = datetime.now()
-        self.last_position = 0
+        self.session_id = self.history.start_session(self.start_time, self.log_file)
+        self.engine.reset(self.start_time)
+        self.restart_ingest()
         self.update_stats()
 
         # Clear graph data
-        self.gold_graph.data_points = []
-        self.exp_graph.data_points = []
+        self.gold_graph.series.clear()
+        self.exp_graph.series.clear()
+        self.draw_graph(self.gold_graph)
+        self.draw_graph(self.exp_graph)
         self.last_update = None
 
     def export_session(self):
-        session_datetime = datetime.now().strftime('%y%m%d-%H-%M')
+        now = datetime.now()
+        session_datetime = now.strftime('%y%m%d-%H-%M')
         file_name = f"hunting_session_{session_datetime}.txt"
         
-        # Create a list of known event point types
-        event_point_types = {'halloween point', 'christmas voucher', 'anniversary token', 'demonic ticket'}
-        
+        # The rolling rates end now, not at the last looted corpse
+        self.engine.rates.advance(time_key(now) // 60)
+        elapsed_seconds = (now - self.start_time).total_seconds()
         with open(file_name, 'w', encoding='utf-8') as file:
-            # Session Summary
-            file.write(f"Session Time: {self.session_label.cget('text')}\n")
-            file.write(f"Total Gold: {self.total_gold:,}\n")
-            file.write(f"Total Exp: {self.total_exp:,}\n")
-            file.write(f"Gold/Hour: {self.gold_per_hour_label.cget('text')}\n")
-            file.write(f"Exp/Hour: {self.exp_per_hour_label.cget('text')}\n\n")
-            
-            # Loot Items with Drop Rates
-            file.write("Loot Items:\n")
-            file.write("-" * 100 + "\n")
-            file.write(f"{'Item':<30} {'Count':<10} {'Price':<12} {'Total':<15} {'Drop Rate':<10} {'Sources'}\n")
-            file.write("-" * 100 + "\n")
-            
-            for item, count in sorted(self.loot_counts.items()):
-                if item in event_point_types:
-                    continue
-                    
-                price = self.get_item_price(item)
-                total = price * count
-                
-                # Get drop sources and rates with ranges and averages
-                sources_info = []
-                if item in self.item_sources:
-                    for monster in self.item_sources[item]:
-                        if monster in self.monster_kills:
-                            kills = self.monster_kills[monster]
-                            drops = self.monster_drops[monster].get(item, [])
-                            if kills > 0 and drops:
-                                rate = (len(drops) / kills) * 100
-                                min_qty = min(drops)
-                                max_qty = max(drops)
-                                avg_qty = sum(drops) / len(drops)
-                                qty_range = f"{min_qty}-{max_qty}" if min_qty != max_qty else str(min_qty)
-                                sources_info.append(
-                                    f"{monster} ({rate:.2f}%, avg: {avg_qty:.1f}, range: {qty_range})"
-                                )
-                
-                sources_text = " | ".join(sources_info) if sources_info else "N/A"
-                overall_rate = self.calculate_drop_rate(item)
-                
-                file.write(f"{item:<30} {count:<10} {price:<12,} {total:<15,} {overall_rate:<10} {sources_text}\n")
-            
-            # Monster Kills with Drop Details
-            file.write("\nMonster Kills and Drops:\n")
-            file.write("-" * 100 + "\n")
-            file.write(f"{'Monster':<25} {'Kills':<8} {'Exp/Kill':<10} {'Total Exp':<15} {'Items Dropped'}\n")
-            file.write("-" * 100 + "\n")
-            
-            for monster, kills in sorted(self.monster_kills.items()):
-                exp = self.get_monster_exp(monster)
-                total_exp = exp * kills
-                
-                # Get items dropped by this monster with detailed statistics
-                dropped_items = []
-                if monster in self.monster_drops:
-                    for item, drops in self.monster_drops[monster].items():
-                        drop_rate = (len(drops) / kills) * 100
-                        min_qty = min(drops)
-                        max_qty = max(drops)
-                        avg_qty = sum(drops) / len(drops)
-                        qty_range = f"{min_qty}-{max_qty}" if min_qty != max_qty else str(min_qty)
-                        dropped_items.append(
-                            f"{item} ({drop_rate:.2f}%, avg: {avg_qty:.1f}, range: {qty_range})"
-                        )
-                
-                items_text = " | ".join(dropped_items) if dropped_items else "None"
-                file.write(f"{monster:<25} {kills:<8} {exp:<10,} {total_exp:<15,} {items_text}\n")
-            
-            # Excluded Items and Monsters
-            file.write("\nExcluded Items:\n")
-            for item in self.excluded_items_tree.get_children():
-                file.write(f"{self.excluded_items_tree.item(item)['values'][0]}\n")
-            
-            file.write("\nExcluded Monsters:\n")
-            for monster in self.excluded_monsters_tree.get_children():
-                file.write(f"{self.excluded_monsters_tree.item(monster)['values'][0]}\n")
-            
-            file.write("\nCustom Item Prices:\n")
-            for item, price in self.custom_item_prices.items():
-                file.write(f"{item}: {price:,} gold\n")
-            
+            write_report(file, self.engine, elapsed_seconds)
             print(f"Session data exported to {file_name}")
 
     def search_wiki(self, treeview):
@@ -1264,63 +1084,69 @@ class MediviaAnalyzer(tk.Tk):
             webbrowser.open(url)
 
     def save_settings(self):
+        # A snapshot of the model state; serializing and writing happen on the settings thread
         settings = {
-            'excluded_items': [self.excluded_items_tree.item(child)['values'][0] 
-                            for child in self.excluded_items_tree.get_children()],
-            'excluded_monsters': [self.excluded_monsters_tree.item(child)['values'][0] 
-                                for child in self.excluded_monsters_tree.get_children()],
-            'custom_prices': self.custom_item_prices,
+            'excluded_items': sorted(self.engine.excluded_items),
+            'excluded_monsters': sorted(self.engine.excluded_monsters),
+            'custom_prices': dict(self.catalog.custom_item_prices),
+            'rate_window': self.rate_choice.get(),
+            'sort_columns': self.sort_settings(),
             'window_size': {
                 'width': self.winfo_width(),
                 'height': self.winfo_height()
             }
         }
-        
-        with open('analyzer_settings.json', 'w') as f:
-            json.dump(settings, f)
+        self.settings_store.save(settings)
 
     def load_settings(self):
-        try:
-            with open('analyzer_settings.json', 'r') as f:
-                settings = json.load(f)
-                
-                # Restore window size
-                if 'window_size' in settings:
-                    width = settings['window_size']['width']
-                    height = settings['window_size']['height']
-                    self.geometry(f"{width}x{height}")
-                
-                # Restore excluded items
-                for item in settings.get('excluded_items', []):
-                    self.add_to_exclude_list(self.excluded_items_tree, item)
-                
-                # Restore excluded monsters
-                for monster in settings.get('excluded_monsters', []):
-                    self.add_to_exclude_list(self.excluded_monsters_tree, monster)
-                
-                # Restore custom prices
-                self.custom_item_prices = settings.get('custom_prices', {})
-                self.update_custom_prices_tree()
-        except FileNotFoundError:
-            pass
+        settings = self.settings_store.load()
+
+        # Restore window size
+        if 'window_size' in settings:
+            width = settings['window_size']['width']
+            height = settings['window_size']['height']
+            self.geometry(f"{width}x{height}")
+
+        # Restore excluded items and monsters
+        self.engine.set_excluded_items(settings.get('excluded_items', []))
+        self.engine.set_excluded_monsters(settings.get('excluded_monsters', []))
+        self.update_excluded_trees()
+
+        # Restore custom prices
+        self.engine.set_custom_prices(settings.get('custom_prices', {}))
+        self.update_custom_prices_tree()
+
+        # Restore the rate window
+        if settings.get('rate_window') in self.rate_choices:
+            self.rate_choice.set(settings['rate_window'])
+            self.update_rate_titles()
+
+        # Restore the table sorts
+        sort_columns = settings.get('sort_columns', {})
+        for name, table in (('loot', self.loot_table), ('monsters', self.monster_table)):
+            column, reverse = sort_columns.get(name, (None, False))
+            if column in table.columns:
+                self.apply_sort(table.tree, column, bool(reverse))
 
     def add_hover_effect(self, treeview):
-        def on_enter(event):
-            # Get the item (row) under the mouse cursor
-            item = treeview.identify_row(event.y)
-            
-            # Remove hover tag from all items
-            for i in treeview.get_children():
-                treeview.item(i, tags=())
-                
-            # Add hover tag only to the item under cursor
+        # Only the previously hovered row and the new one are touched
+        hovered = [None]
+
+        def set_hovered(item):
+            if item == hovered[0]:
+                return
+            if hovered[0] is not None and treeview.exists(hovered[0]):
+                treeview.item(hovered[0], tags=())
             if item:
                 treeview.item(item, tags=('hover',))
+            hovered[0] = item or None
+
+        def on_enter(event):
+            # Get the item (row) under the mouse cursor
+            set_hovered(treeview.identify_row(event.y))
         
         def on_leave(event):
-            # Remove hover tag from all items when mouse leaves treeview
-            for item in treeview.get_children():
-                treeview.item(item, tags=())
+            set_hovered(None)
         
         # Configure the hover style
         style = ttk.Style()
@@ -1366,9 +1192,14 @@ class MediviaAnalyzer(tk.Tk):
         def save_entry(event=None):
             new_value = entry.get().strip().lower()
             if new_value:
-                tree.set(item, '#1', new_value)
+                if tree == self.excluded_items_tree:
+                    self.engine.include_item(str(current_value))
+                    self.engine.exclude_item(new_value)
+                else:
+                    self.engine.include_monster(str(current_value))
+                    self.engine.exclude_monster(new_value)
+                self.update_excluded_trees()
                 self.save_settings()
-                self.reprocess_log_file()
                 self.update_stats()
                 self.calculate_totals()
             entry.destroy()
@@ -1414,19 +1245,20 @@ class MediviaAnalyzer(tk.Tk):
                 new_name = entry.get().strip().lower()
                 if new_name:
                     old_name = current_values[0]
-                    price = self.custom_item_prices[old_name]
-                    del self.custom_item_prices[old_name]
-                    self.custom_item_prices[new_name] = price
+                    price = self.catalog.custom_item_prices[old_name]
+                    self.engine.remove_custom_price(old_name)
+                    self.engine.set_custom_price(new_name, price)
             else:
                 try:
                     new_price = int(entry.get())
-                    self.custom_item_prices[current_values[0]] = new_price
+                    self.engine.set_custom_price(current_values[0], new_price)
                 except ValueError:
                     entry.destroy()
                     return
                     
             self.update_custom_prices_tree()
             self.save_settings()
+            self.update_stats()
             entry.destroy()
         
         entry.bind('<Return>', save_edit)
@@ -1466,6 +1298,91 @@ class MediviaAnalyzer(tk.Tk):
                                 command=self.open_discord)
         discord_button.pack(pady=(0, 20))
 
+    def setup_diagnostics_tab(self):
+        # Hidden unless toggled with Ctrl+Shift+D or started with --diagnostics
+        self.diagnostics_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.diagnostics_frame, text="Diagnostics")
+        self.notebook.hide(self.diagnostics_frame)
+        self.bind('<Control-D>', lambda event: self.toggle_diagnostics())
+
+        columns = ("Path", "Calls", "p50 ms", "p95 ms", "Max ms")
+        timings_tree = ttk.Treeview(self.diagnostics_frame, columns=columns, show="headings",
+                                    style='Custom.Treeview', height=6)
+        for column in columns:
+            timings_tree.heading(column, text=column)
+            timings_tree.column(column, width=120, anchor='center')
+        timings_tree.pack(fill=tk.X, padx=10, pady=10)
+        format_row = lambda values: (values[0], f"{values[1]:,}") + tuple(f"{value:.2f}" for value in values[2:])
+        self.timings_table = TreeTable(timings_tree, columns, format_row)
+
+        self.ingest_rate_label = ttk.Label(self.diagnostics_frame, text="Ingested: 0 lines/s")
+        self.ingest_rate_label.pack(anchor='w', padx=10)
+        self.behind_label = ttk.Label(self.diagnostics_frame, text="Behind log tail: 0 bytes")
+        self.behind_label.pack(anchor='w', padx=10)
+        self.tk_share_label = ttk.Label(self.diagnostics_frame, text="Tk: 0.0 ms/s, Python: 0.0 ms/s")
+        self.tk_share_label.pack(anchor='w', padx=10)
+        self.normalizer_label = ttk.Label(self.diagnostics_frame, text="Item names: 0% cached")
+        self.normalizer_label.pack(anchor='w', padx=10)
+
+        dump_button = ttk.Button(self.diagnostics_frame, text="Dump", style='Rounded.TButton',
+                                 command=self.dump_diagnostics)
+        dump_button.pack(anchor='w', padx=10, pady=10)
+
+        self.diagnostics_sample = None
+        if '--diagnostics' in sys.argv:
+            self.toggle_diagnostics()
+        self.update_diagnostics()
+
+    def toggle_diagnostics(self):
+        if self.notebook.tab(self.diagnostics_frame, 'state') == 'hidden':
+            self.notebook.add(self.diagnostics_frame)
+            self.notebook.select(self.diagnostics_frame)
+        else:
+            self.notebook.hide(self.diagnostics_frame)
+
+    def diagnostics_rates(self):
+        # Per second rates since the previous sample
+        now = time.perf_counter()
+        sample = (now, self.ingest.lines_read, self.timings.busy_seconds, self.timings.tk_seconds)
+        previous, self.diagnostics_sample = self.diagnostics_sample, sample
+        if previous is None or now <= previous[0]:
+            return 0, 0.0, 0.0
+        seconds = now - previous[0]
+        lines = (sample[1] - previous[1]) / seconds
+        busy = (sample[2] - previous[2]) / seconds
+        tk_busy = (sample[3] - previous[3]) / seconds
+        return int(lines), tk_busy * 1000, (busy - tk_busy) * 1000
+
+    def update_diagnostics(self):
+        # Only refreshed while the tab is on screen
+        if self.notebook.select() == str(self.diagnostics_frame):
+            self.timings_table.update({
+                name: (name, summary['calls'], summary['p50_ms'], summary['p95_ms'], summary['max_ms'])
+                for name, summary in self.timings.summary().items()})
+            lines_per_second, tk_ms, python_ms = self.diagnostics_rates()
+            normalizer = self.catalog.normalizer
+            self.set_label_text(self.ingest_rate_label, f"Ingested: {lines_per_second:,} lines/s")
+            self.set_label_text(self.behind_label, f"Behind log tail: {self.follower.pending():,} bytes")
+            self.set_label_text(self.tk_share_label, f"Tk: {tk_ms:.1f} ms/s, Python: {python_ms:.1f} ms/s")
+            self.set_label_text(self.normalizer_label,
+                                f"Item names: {normalizer.hit_rate:.0%} cached, "
+                                f"{normalizer.dictionary_rate:.0%} found in the database")
+        else:
+            self.diagnostics_sample = None
+        self.after(1000, self.update_diagnostics)
+
+    def dump_diagnostics(self):
+        file_name = f"diagnostics_{datetime.now().strftime('%y%m%d-%H-%M-%S')}.json"
+        normalizer = self.catalog.normalizer
+        self.timings.dump(file_name, {
+            'lines_read': self.ingest.lines_read,
+            'bytes_read': self.ingest.bytes_read,
+            'bytes_behind': self.follower.pending(),
+            'normalizer_hit_rate': normalizer.hit_rate,
+            'normalizer_dictionary_rate': normalizer.dictionary_rate,
+        })
+        print(f"Diagnostics dumped to {file_name}")
+
     def open_discord(self):
         import webbrowser
         webbrowser.open('https://discordapp.com/users/148334042100531200')
@@ -1481,4 +1398,9 @@ class MediviaAnalyzer(tk.Tk):
 
 if __name__ == "__main__":
     app = MediviaAnalyzer()
+    if '--startup-time' in sys.argv:
+        # Printed once the window has been drawn and Tk is idle
+        app.after_idle(lambda: print(
+            f"Startup: {(time.perf_counter() - STARTED_AT) * 1000:.0f} ms "
+            f"(database: {app.database_seconds * 1000:.0f} ms)"))
     app.mainloop()
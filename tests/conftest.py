@@ -0,0 +1,26 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, 'benchmarks'))
+
+from analyzer.database import load_database
+from loot_generator import DB_PATH, write_log
+
+LINES = 20000
+
+
+@pytest.fixture(scope='session')
+def log_path(tmp_path_factory):
+    # A generated Loot.txt of about a week of hunts, from 2024-11-22 18:00
+    path = str(tmp_path_factory.mktemp('logs') / 'Loot.txt')
+    write_log(path, LINES, seed=3)
+    return path
+
+
+@pytest.fixture(scope='session')
+def database():
+    return load_database(DB_PATH)
@@ -0,0 +1,50 @@
+from datetime import datetime
+
+import pytest
+
+from analyzer.bulk import bulk_import
+from analyzer.catalog import Catalog
+from analyzer.engine import LootEngine
+
+
+def counts(engine):
+    drop_stats = {monster: {item: (stats.count, stats.total, stats.total_squares, stats.min, stats.max, stats.histogram)
+                            for item, stats in drops.items()}
+                  for monster, drops in engine.monster_drops.items()}
+    rates = engine.rates
+    return {
+        'monster_kills': dict(engine.monster_kills.items()),
+        'loot_counts': dict(engine.loot_counts.items()),
+        'total_gold': engine.total_gold,
+        'total_exp': engine.total_exp,
+        'monster_drops': drop_stats,
+        'item_sources': engine.item_sources,
+        'rates': (rates.minute, rates.gold_sums, rates.exp_sums, list(rates.gold), list(rates.exp)),
+    }
+
+
+@pytest.mark.parametrize('excluded', [((), ()), (('gold coin',), ('wight',))])
+@pytest.mark.parametrize('window', [
+    (None, None),
+    (datetime(2024, 11, 25), datetime(2024, 11, 27, 12, 30)),
+    (None, datetime(2024, 11, 26, 3, 7)),
+])
+@pytest.mark.parametrize('keep_events', [False, True])
+def test_bulk_import_matches_sequential_feed(log_path, database, excluded, window, keep_events):
+    sequential = LootEngine(None, *excluded, catalog=Catalog(*database))
+    sequential.set_window(*window)
+    with open(log_path, 'rb') as f:
+        sequential.feed(f.read())
+
+    bulk = LootEngine(None, *excluded, catalog=Catalog(*database))
+    bulk.set_window(*window)
+    summary = bulk_import(log_path, bulk, workers=2, keep_events=keep_events)
+
+    assert sum(bulk.monster_kills.values()) > 0
+    assert counts(bulk) == counts(sequential)
+    assert summary.events == len(sequential.store)
+    if keep_events:
+        assert list(bulk.store.kill_monsters) == list(sequential.store.kill_monsters)
+        assert list(bulk.store.loot_items) == list(sequential.store.loot_items)
+    else:
+        assert not len(bulk.store)
@@ -0,0 +1,27 @@
+from datetime import datetime
+
+import pytest
+
+from analyzer.bulk import bulk_import
+from analyzer.catalog import Catalog
+from analyzer.engine import LootEngine
+from analyzer.store import time_key
+
+
+@pytest.mark.parametrize('end', [datetime(2024, 11, 26, 4, 0), datetime(2024, 11, 26, 3, 59, 30)])
+@pytest.mark.parametrize('bulk', [False, True])
+def test_hour_window_rates_cover_the_whole_window(log_path, database, end, bulk):
+    # The window end is exclusive: a window ending on a full minute must not
+    # count the empty minute after it in place of its first minute
+    engine = LootEngine(catalog=Catalog(*database))
+    engine.set_window(datetime(2024, 11, 26, 3, 0), end)
+    if bulk:
+        bulk_import(log_path, engine, workers=2)
+    else:
+        with open(log_path, 'rb') as f:
+            engine.feed(f.read())
+
+    assert engine.total_gold > 0
+    assert engine.rates.minute == time_key(datetime(2024, 11, 26, 3, 59)) // 60
+    assert engine.rates.gold_sums[60] == engine.total_gold
+    assert engine.rates.exp_sums[60] == engine.total_exp
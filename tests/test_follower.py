@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+from analyzer.follower import LogFollower
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / 'Loot.txt'
+    path.write_bytes(b'')
+    follower = LogFollower(str(path), use_inotify=False)
+    yield path, follower
+    follower.close()
+
+
+def append(path, data):
+    with open(path, 'ab') as f:
+        f.write(data)
+
+
+def test_partial_line_is_kept_until_its_newline(log):
+    path, follower = log
+    append(path, b'18:00 Loot of a rat: nothing.\n18:01 Loot of')
+    assert follower.read() == b'18:00 Loot of a rat: nothing.\n'
+    assert follower.line_position == len(b'18:00 Loot of a rat: nothing.\n')
+
+    append(path, b' a wolf: meat.')
+    assert follower.read() == b''
+    append(path, b'\n')
+    assert follower.read() == b'18:01 Loot of a wolf: meat.\n'
+    assert follower.line_position == follower.position == os.path.getsize(path)
+
+
+def test_bounded_reads_return_every_line_once(log):
+    path, follower = log
+    lines = [f'18:{minute:02d} Loot of a rat: {minute} gold coins.\n'.encode() for minute in range(60)]
+    append(path, b''.join(lines))
+    data = b''
+    while follower.position < os.path.getsize(path):
+        data += follower.read(max_bytes=100)
+    assert data == b''.join(lines)
+    assert follower.pending() == 0
+
+
+def test_truncation_rewinds_to_the_start(log):
+    path, follower = log
+    append(path, b'18:00 Loot of a rat: nothing.\n18:01 Loot of a rat: a cheese.\n')
+    follower.read()
+
+    path.write_bytes(b'19:00 Loot of a bat: nothing.\n')
+    assert follower.read() == b'19:00 Loot of a bat: nothing.\n'
+    assert follower.position == os.path.getsize(path)
+
+
+def test_rotation_reads_the_new_file_from_the_start(log):
+    path, follower = log
+    append(path, b'18:00 Loot of a rat: nothing.\n')
+    follower.read()
+
+    # A new file at least as large as the read position is only told apart by its inode
+    rotated = path.with_name('Loot.new')
+    rotated.write_bytes(b'20:00 Loot of a troll: a spear.\n20:01 Loot of a troll: nothing.\n')
+    os.replace(rotated, path)
+    assert follower.read() == b'20:00 Loot of a troll: a spear.\n20:01 Loot of a troll: nothing.\n'
+
+
+def test_poll_backs_off_until_the_file_changes(log):
+    path, follower = log
+    follower.read()
+    assert not follower.poll()
+    assert not follower.poll()
+    assert follower.interval == pytest.approx(follower.min_interval * 4)
+
+    append(path, b'18:00 Loot of a rat: nothing.\n')
+    assert follower.poll()
+    follower.read()
+    assert follower.interval == follower.min_interval
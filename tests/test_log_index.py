@@ -0,0 +1,116 @@
+import shutil
+from datetime import datetime
+
+import pytest
+
+from analyzer.engine import LogParser, LootEvent
+from analyzer.log_index import HEAD_SIZE, LogIndex
+
+
+@pytest.fixture
+def log(tmp_path, log_path):
+    # A copy, so the index can be written next to it and the log changed
+    path = str(tmp_path / 'Loot.txt')
+    shutil.copyfile(log_path, path)
+    index = LogIndex(path)
+    index.update()
+    return path, index
+
+
+def read(path, offset=0):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read()
+
+
+def events_after(path, start_time):
+    return LogParser(start_time).feed(read(path))
+
+
+def events_from_index(path, index, start_time):
+    # What the ingest worker does on a restart
+    offset, section_datetime = index.seek_position(start_time)
+    parser = LogParser(start_time)
+    parser.reset(start_time, section_datetime)
+    return parser.feed(read(path, offset))
+
+
+@pytest.mark.parametrize('start_time', [
+    datetime(2024, 11, 22, 18, 0),
+    datetime(2024, 11, 23, 0, 0),
+    datetime(2024, 11, 25, 13, 37),
+    datetime(2024, 11, 29, 1, 24),
+])
+def test_seek_gives_the_events_of_a_full_read(log, start_time):
+    path, index = log
+    assert index.seek_position(start_time)[1] is not None
+    events = events_from_index(path, index, start_time)
+    assert events
+    assert events == events_after(path, start_time)
+
+
+def test_seek_before_the_log_starts_reads_everything(log):
+    path, index = log
+    # The first line after the first header
+    assert index.seek_position(datetime(2024, 1, 1)) == (index.minutes[0][1], datetime(2024, 11, 22, 18, 1))
+    assert events_from_index(path, index, datetime(2024, 1, 1)) == events_after(path, None)
+    assert index.seek_position(None) == (0, None)
+
+
+def test_seek_after_the_indexed_content_starts_at_its_end(log):
+    path, index = log
+    start_time = datetime(2024, 12, 1)
+    offset, section_datetime = index.seek_position(start_time)
+    assert offset == index.indexed_to == len(read(path))
+    assert section_datetime == index.section_datetimes[-1]
+    assert events_from_index(path, index, start_time) == []
+
+    # Lines appended later are read from there
+    with open(path, 'a') as f:
+        f.write("Channel saved at Sun Dec 01 10:00:00 2024\n10:05 Loot of a rat: 3 gold coins.\n")
+    events = events_from_index(path, index, start_time)
+    assert [(event.timestamp, event.item) for event in events if isinstance(event, LootEvent)] == \
+        [(datetime(2024, 12, 1, 10, 5), 'gold coin')]
+
+
+def test_update_only_indexes_complete_lines(log):
+    path, index = log
+    indexed_to = index.indexed_to
+    with open(path, 'a') as f:
+        f.write("01:30 Loot of a rat: noth")
+    index.update()
+    assert index.indexed_to == indexed_to
+
+
+def test_saved_index_is_loaded_again(log):
+    path, index = log
+    index.save()
+    loaded = LogIndex(path)
+    assert not loaded.dirty
+    assert (loaded.head, loaded.indexed_to, loaded.section_offsets, loaded.section_datetimes, loaded.minutes) == \
+        (index.head, index.indexed_to, index.section_offsets, index.section_datetimes, index.minutes)
+
+
+def test_replaced_log_is_indexed_again(log):
+    path, index = log
+    assert index.indexed_to > HEAD_SIZE
+    # Same size or larger, only the head tells the new log apart
+    replacement = read(path).replace(b'Channel saved at Fri Nov 22', b'Channel saved at Sat Nov 23', 1)
+    with open(path, 'wb') as f:
+        f.write(replacement)
+    index.update()
+    assert index.section_datetimes[0] == datetime(2024, 11, 23, 18, 1)
+    assert index.section_offsets[0] == 0
+    assert index.indexed_to == len(replacement)
+
+
+def test_truncated_log_is_indexed_again(log):
+    path, index = log
+    head = read(path)[:HEAD_SIZE * 2]
+    with open(path, 'wb') as f:
+        f.write(head[:head.rfind(b'\n') + 1])
+    index.update()
+    assert index.indexed_to == head.rfind(b'\n') + 1
+    assert all(offset < index.indexed_to for key, offset in index.minutes)
+    start_time = datetime(2024, 11, 22, 18, 5)
+    assert events_from_index(path, index, start_time) == events_after(path, start_time)
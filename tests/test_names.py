@@ -0,0 +1,78 @@
+import pytest
+
+from analyzer.names import IRREGULAR_PLURALS, ItemNormalizer, normalize_plural, plural_forms
+from loot_generator import plural
+
+
+@pytest.fixture(scope='module')
+def normalizer(database):
+    return ItemNormalizer(database[0])
+
+
+@pytest.mark.parametrize('entry, expected', [
+    ('a small ruby', ('small ruby', 1)),
+    ('3 small rubies', ('small ruby', 3)),
+    ('2 hallowed pieces of cloth', ('hallowed piece of cloth', 2)),
+    ('a steel boots', ('steel boots', 1)),
+    ('2 leather legs', ('leather legs', 2)),
+    ('2 white pearls.', ('white pearl', 2)),
+    ('an amulet of loss', ('amulet of loss', 1)),
+    (' 5 scarab coins', ('scarab coin', 5)),
+    # Not in db.json: the plural rules decide
+    ('2 knives', ('knife', 2)),
+    ('94 gold coins', ('gold coin', 94)),
+    ('3 wolf paws', ('wolf paw', 3)),
+    ('2 dragon hams', ('dragon ham', 2)),
+    ('meat', ('meat', 1)),
+    ('a bag', None),
+    ('empty', None),
+])
+def test_entries(normalizer, entry, expected):
+    assert normalizer.resolve(entry) == expected
+
+
+def test_every_db_name_and_client_plural(database, normalizer):
+    for name in database[0]:
+        assert normalizer.resolve(f"a {name}") == (name, 1)
+        assert normalizer.resolve(f"12 {plural(name)}") == (name, 12)
+
+
+def test_only_names_missing_from_the_db_use_the_rules(database):
+    normalizer = ItemNormalizer(database[0])
+    normalizer.resolve('7 small rubies')
+    normalizer.resolve('2 hallowed pieces of cloth')
+    assert normalizer.rule_fallbacks == 0
+    normalizer.resolve('2 knives')
+    assert normalizer.rule_fallbacks == 1
+    assert normalizer.dictionary_rate == pytest.approx(2 / 3)
+
+
+@pytest.mark.parametrize('word, expected', [
+    ('knives', 'knife'),
+    ('throwing knives', 'throwing knife'),
+    ('small rubies', 'small ruby'),
+    ('gold coins', 'gold coin'),
+    ('a wolf paw', 'wolf paw'),
+    ('wolves', 'wolf'),
+    ('steel boots', 'steel boots'),
+    ('plate legs', 'plate legs'),
+    ('meat', 'meat'),
+])
+def test_normalize_plural(word, expected):
+    assert normalize_plural(word) == expected
+
+
+@pytest.mark.parametrize('plural_form, singular', sorted(IRREGULAR_PLURALS.items()))
+def test_irregular_plurals_are_not_left_to_the_suffix_rules(plural_form, singular):
+    assert normalize_plural(plural_form) == singular
+    assert ItemNormalizer().resolve(f"2 {plural_form}") == (singular, 2)
+
+
+@pytest.mark.parametrize('word, forms', [
+    ('ruby', ['rubys', 'rubyes', 'rubies']),
+    ('knife', ['knifes', 'knifees', 'knives']),
+    ('wolf', ['wolfs', 'wolfes', 'wolves']),
+    ('coin', ['coins', 'coines']),
+])
+def test_plural_forms(word, forms):
+    assert plural_forms(word) == forms
@@ -0,0 +1,60 @@
+import random
+
+import pytest
+
+from analyzer.rates import RATE_WINDOWS, RollingRates, window_label
+
+
+def window_sums(events, latest):
+    # Brute force over every event added so far
+    return ({window: sum(gold for minute, gold, exp in events if latest - window < minute <= latest)
+             for window in RATE_WINDOWS},
+            {window: sum(exp for minute, gold, exp in events if latest - window < minute <= latest)
+             for window in RATE_WINDOWS})
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_window_sums_match_brute_force(seed):
+    generator = random.Random(seed)
+    rates = RollingRates()
+    events = []
+    minute = 13_000_000
+    for _ in range(2000):
+        # Mostly the current minute, sometimes a gap (longer than the ring
+        # too), sometimes a late event of an earlier minute
+        roll = generator.random()
+        if roll < 0.2:
+            minute += generator.choice((1, 1, 2, 7, 30, 200))
+        event_minute = minute - generator.randrange(90) if roll > 0.95 else minute
+        gold, exp = generator.randrange(1000), generator.randrange(500)
+        rates.add(event_minute, gold, exp)
+        events.append((event_minute, gold, exp))
+        assert (rates.gold_sums, rates.exp_sums) == window_sums(events, rates.minute)
+
+    # Time moves on without events until every window is empty
+    for step in (1, 4, 10, 45, 61):
+        rates.advance(rates.minute + step)
+        assert (rates.gold_sums, rates.exp_sums) == window_sums(events, rates.minute)
+    assert not any(rates.gold_sums.values())
+
+
+def test_advancing_backwards_keeps_the_newest_minute():
+    rates = RollingRates()
+    rates.add(100, gold=5)
+    rates.advance(90)
+    assert rates.minute == 100
+    assert rates.gold_sums == {5: 5, 15: 5, 60: 5}
+
+
+def test_per_hour():
+    rates = RollingRates()
+    rates.add(100, gold=600, exp=60)
+    assert rates.per_hour(5) == (7200, 720)
+    # A session of 2 minutes is averaged over its own length
+    assert rates.per_hour(60, elapsed_seconds=120) == (18000, 1800)
+    assert rates.per_hour(60, elapsed_seconds=0) == (0, 0)
+
+
+@pytest.mark.parametrize('minutes, label', [(5, '5 min'), (15, '15 min'), (60, '1 hour'), (120, '2 hours')])
+def test_window_label(minutes, label):
+    assert window_label(minutes) == label
@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from analyzer.series import TimeSeries
+
+
+def filled(samples, capacity=None):
+    series = TimeSeries(capacity or len(samples))
+    for time, value in samples:
+        series.append(time, value)
+    return series
+
+
+def test_ring_keeps_the_newest_samples():
+    series = filled([(float(time), float(time * 2)) for time in range(10)], capacity=4)
+    assert len(series) == 4
+    assert list(series.samples()) == [(6.0, 12.0), (7.0, 14.0), (8.0, 16.0), (9.0, 18.0)]
+    assert list(series.samples(since=7.0)) == [(8.0, 16.0), (9.0, 18.0)]
+
+
+def test_short_series_is_not_reduced():
+    samples = [(float(time), float(time % 3)) for time in range(10)]
+    assert filled(samples).downsample(5) == samples
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('buckets', [1, 7, 100])
+def test_downsample_keeps_the_min_and_max_of_every_bucket(seed, buckets):
+    generator = random.Random(seed)
+    time = 0.0
+    samples = []
+    for _ in range(5000):
+        time += generator.choice((0.5, 1.0, 1.0, 3.0, 60.0))
+        samples.append((time, float(generator.randrange(-1000, 1000))))
+    series = filled(samples, capacity=4000)
+    kept = list(series.samples())
+
+    reduced = series.downsample(buckets)
+    assert len(reduced) <= 2 * buckets
+    assert reduced == sorted(reduced)
+    assert set(reduced) <= set(kept)
+
+    first_time = kept[0][0]
+    span = kept[-1][0] - first_time
+
+    def bucket(sample):
+        return min(int((sample[0] - first_time) * buckets / span), buckets - 1)
+
+    for index in {bucket(sample) for sample in kept}:
+        values = [value for time, value in kept if bucket((time, value)) == index]
+        reduced_values = [value for time, value in reduced if bucket((time, value)) == index]
+        assert min(reduced_values) == min(values)
+        assert max(reduced_values) == max(values)
+
+
+def test_downsample_of_a_single_instant():
+    series = filled([(5.0, float(value)) for value in (3, 9, -2, 4, 1)])
+    assert series.downsample(1) == [(5.0, -2.0), (5.0, 9.0)]
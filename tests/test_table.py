@@ -0,0 +1,142 @@
+import random
+
+import pytest
+
+from analyzer.table import TreeTable
+
+
+class StubTree:
+    """The part of a ttk.Treeview that TreeTable uses"""
+
+    def __init__(self, height=5):
+        self.height = height
+        self.rows = {}  # iid -> values
+        self.order = []
+        self.writes = 0
+        self.selected = ()
+        self.next_iid = 0
+
+    def cget(self, option):
+        return self.height
+
+    def configure(self, **options):
+        pass
+
+    def bind(self, sequence, func, add=None):
+        pass
+
+    def insert(self, parent, index, values=()):
+        iid = f"I{self.next_iid}"
+        self.next_iid += 1
+        self.rows[iid] = values
+        self.order.append(iid)
+        return iid
+
+    def delete(self, iid):
+        del self.rows[iid]
+        self.order.remove(iid)
+
+    def item(self, iid, values):
+        self.rows[iid] = values
+        self.writes += 1
+
+    def get_children(self):
+        return tuple(self.order)
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, selection):
+        self.selected = tuple(selection)
+
+    def shown(self):
+        return [self.rows[iid] for iid in self.order]
+
+
+def format_row(values):
+    return tuple(str(value) for value in values)
+
+
+def make_table(height=5):
+    tree = StubTree(height)
+    return tree, TreeTable(tree, ('name', 'count'), format_row)
+
+
+def expected_order(rows, column, reverse):
+    return [key for key, values in sorted(rows.items(), key=lambda row: (row[1][column], row[0]), reverse=reverse)]
+
+
+def test_update_shows_the_first_rows_in_sort_order():
+    tree, table = make_table()
+    rows = {name: (name, count) for name, count in [('rat', 3), ('bat', 7), ('wolf', 1), ('orc', 5),
+                                                     ('troll', 2), ('dragon', 9), ('cyclops', 4)]}
+    table.update(rows)
+    assert len(table) == 7
+    assert table.order == expected_order(rows, 0, False)
+    assert tree.shown() == [format_row(rows[key]) for key in expected_order(rows, 0, False)[:5]]
+
+    table.set_sort('count', True)
+    assert table.visible_keys() == expected_order(rows, 1, True)[:5]
+    assert tree.shown() == [format_row(rows[key]) for key in expected_order(rows, 1, True)[:5]]
+
+
+@pytest.mark.parametrize('changes', [1, 40])
+def test_updates_keep_the_order(changes):
+    # One change moves its row, many changes re-sort the whole order
+    generator = random.Random(changes)
+    tree, table = make_table(height=10)
+    rows = {f"item {index}": (f"item {index}", generator.randrange(50)) for index in range(100)}
+    table.update(rows)
+    table.set_sort('count', False)
+    for _ in range(20):
+        rows = dict(rows)
+        for key in generator.sample(sorted(rows), changes):
+            rows[key] = (key, generator.randrange(50))
+        for key in generator.sample(sorted(rows), 2):
+            del rows[key]
+        rows[f"new {generator.random()}"] = ('new', generator.randrange(50))
+        table.update(rows)
+        assert table.order == expected_order(rows, 1, False)
+        assert tree.shown() == [format_row(rows[key]) for key in expected_order(rows, 1, False)[:10]]
+
+
+def test_only_changed_rows_are_written():
+    tree, table = make_table()
+    rows = {name: (name, index) for index, name in enumerate('abcdefgh')}
+    table.update(rows)
+    writes = tree.writes
+    table.update(dict(rows))
+    assert tree.writes == writes
+
+    table.update(dict(rows, c=('c', 2)))
+    assert tree.writes == writes
+    table.update(dict(rows, c=('c', 99)))
+    assert tree.writes == writes + 1
+
+
+def test_scrolling_moves_the_window_over_the_order():
+    tree, table = make_table(height=3)
+    rows = {name: (name, index) for index, name in enumerate('abcdefgh')}
+    table.update(rows)
+    table.yview('scroll', 2, 'units')
+    assert table.visible_keys() == ['c', 'd', 'e']
+    table.yview('scroll', 1, 'pages')
+    assert table.visible_keys() == ['f', 'g', 'h']
+    table.yview('moveto', '0.0')
+    assert table.visible_keys() == ['a', 'b', 'c']
+    table.set_sort('name', True)
+    assert tree.shown() == [format_row(rows[key]) for key in 'hgf']
+
+
+def test_selection_follows_its_row():
+    tree, table = make_table(height=3)
+    rows = {name: (name, index) for index, name in enumerate('abcde')}
+    table.update(rows)
+    tree.selected = (tree.order[0],)
+    table.on_select()
+    assert table.selected_keys == {'a'}
+
+    table.set_sort('name', True)
+    assert [table.keys[iid] for iid in tree.selection()] == []
+    table.set_sort('name', False)
+    assert [table.keys[iid] for iid in tree.selection()] == ['a']